@@ -4,9 +4,21 @@ from datetime import datetime
 from pathlib import Path
 from decimal import Decimal
 from enum import Enum
+import mimetypes
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from pydantic import BaseModel
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
+
+# (connect, read) timeout in seconds
+Timeout = float | tuple[float, float]
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT: Timeout = (3.05, 30)
+DEFAULT_UPLOAD_WORKERS = 4
 
 
 class Note(BaseModel):
@@ -55,6 +67,52 @@ class NoteWithoutContent(BaseModel):
     modified_at: datetime
 
 
+class NotesPage(BaseModel):
+    """A page of notes and the cursor to fetch the next page, if any"""
+
+    notes: list[NoteWithoutContent]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(timestamp: datetime, id: int) -> str:
+    """Encode a keyset pagination cursor from the last item of a page"""
+    return f"{timestamp.isoformat()}|{id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor created by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    timestamp, _, id = cursor.rpartition("|")
+    return datetime.fromisoformat(timestamp), int(id)
+
+
+def paginate_recent_notes(
+    notes: list[NoteWithoutContent],
+    limit: int,
+    cursor: Optional[str],
+) -> NotesPage:
+    """
+    Build a page of the most recently modified notes
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    notes = sorted(notes, key=lambda n: (n.modified_at, n.id), reverse=True)
+    if cursor:
+        before = decode_cursor(cursor)
+        notes = [n for n in notes if (n.modified_at, n.id) < before]
+
+    next_cursor = None
+    if len(notes) > limit:
+        notes = notes[:limit]
+        next_cursor = encode_cursor(notes[-1].modified_at, notes[-1].id)
+    return NotesPage(notes=notes, next_cursor=next_cursor)
+
+
 class AttachNoteRequest(BaseModel):
     child_note_id: int
     parent_note_id: int
@@ -137,6 +195,69 @@ class Asset(BaseModel):
     def get_encoded_location(self) -> str:
         return quote(self.get_stripped_location())
 
+    def get_mime_type(self) -> Optional[str]:
+        return mimetypes.guess_type(self.location)[0]
+
+    def matches_mime_type(self, mime_type: str) -> bool:
+        """Match a full MIME type (image/png) or only its major type (image)"""
+        guessed = self.get_mime_type() or ""
+        if "/" in mime_type:
+            return guessed == mime_type
+        return guessed.split("/")[0] == mime_type
+
+
+class AssetsPage(BaseModel):
+    """A page of assets and the cursor to fetch the next page, if any"""
+
+    assets: list[Asset]
+    next_cursor: Optional[str] = None
+
+
+def paginate_assets(
+    assets: list[Asset],
+    limit: int,
+    cursor: Optional[str],
+    note_id: Optional[int],
+    mime_type: Optional[str],
+    order: Literal["asc", "desc"],
+) -> AssetsPage:
+    """
+    Build a filtered page of assets
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    last = decode_cursor(cursor) if cursor else None
+    if note_id is not None:
+        assets = [a for a in assets if a.note_id == note_id]
+    if mime_type:
+        assets = [a for a in assets if a.matches_mime_type(mime_type)]
+    descending = order == "desc"
+    assets = sorted(assets, key=lambda a: (a.created_at, a.id), reverse=descending)
+    if last:
+        if descending:
+            assets = [a for a in assets if (a.created_at, a.id) < last]
+        else:
+            assets = [a for a in assets if (a.created_at, a.id) > last]
+
+    next_cursor = None
+    if len(assets) > limit:
+        assets = assets[:limit]
+        next_cursor = encode_cursor(assets[-1].created_at, assets[-1].id)
+    return AssetsPage(assets=assets, next_cursor=next_cursor)
+
+
+class AssetUploadResult(BaseModel):
+    """The outcome of uploading one file of a batch"""
+
+    filename: str
+    asset: Optional[Asset] = None
+    error: Optional[str] = None
+
+
+# A path, or a (filename, file object, content type) triple
+UploadFile = str | Path | tuple[str, BinaryIO, Optional[str]]
+
 
 class RenderedNote(BaseModel):
     """Represents a note with rendered markdown content"""
@@ -227,14 +348,52 @@ class Task(BaseModel):
     goal_relationship: Optional[str]
 
 
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """An HTTPAdapter that applies a default timeout to every request sent through it"""
+
+    def __init__(self, *args, timeout: Timeout = DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def create_session(
+    pool_size: int = DEFAULT_POOL_SIZE, timeout: Timeout = DEFAULT_TIMEOUT
+) -> requests.Session:
+    """
+    Create a keep-alive session with a connection pool for the REST API
+
+    Args:
+        pool_size: Maximum number of connections kept open per host, this should
+                   be at least the number of threads serving requests in a worker
+        timeout: Default (connect, read) timeout in seconds for every request
+
+    Returns:
+        requests.Session: A session that can be shared between the API clients
+    """
+    session = requests.Session()
+    adapter = TimeoutHTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, timeout=timeout
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 class API:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, session: Optional[requests.Session] = None):
         self.base_url = base_url
+        # Share a single session between clients to reuse pooled connections
+        self.session = session if session is not None else create_session()
 
 
 class NoteAPI(API):
-    def __init__(self, base_url: str):
-        super().__init__(base_url)
+    def __init__(self, base_url: str, session: Optional[requests.Session] = None):
+        super().__init__(base_url, session)
 
     def update_notes_tree(self, notes: list[TreeNote]) -> None:
         """
@@ -247,7 +406,7 @@ class NoteAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.put(
+        response = self.session.put(
             f"{self.base_url}/notes/tree",
             headers={"Content-Type": "application/json"},
             json=[note.model_dump(exclude_unset=True) for note in notes],
@@ -271,7 +430,7 @@ class NoteAPI(API):
         """
         request_data = CreateNoteRequest(title=title, content=content)
 
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/notes/flat",
             headers={"Content-Type": "application/json"},
             data=request_data.model_dump_json(),
@@ -294,7 +453,7 @@ class NoteAPI(API):
             requests.exceptions.RequestException: If the request fails
             requests.exceptions.HTTPError: If the note is not found (404)
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/notes/flat/{note_id}",
             headers={"Content-Type": "application/json"},
         )
@@ -319,7 +478,7 @@ class NoteAPI(API):
             requests.exceptions.RequestException: If the request fails
             requests.exceptions.HTTPError: If the note is not found (404)
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/notes/flat/{note_id}",
             params={"exclude_content": "true"},
             headers={"Content-Type": "application/json"},
@@ -340,7 +499,7 @@ class NoteAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/notes/flat",
             headers={"Content-Type": "application/json"},
         )
@@ -362,7 +521,7 @@ class NoteAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/notes/flat",
             params={"exclude_content": "true"},
             headers={"Content-Type": "application/json"},
@@ -371,6 +530,36 @@ class NoteAPI(API):
         response.raise_for_status()
         return [NoteWithoutContent.model_validate(note) for note in response.json()]
 
+    def get_recent_notes(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> NotesPage:
+        """
+        Retrieve the most recently modified notes, without their content
+
+        Notes are ordered by modified_at (then id) descending. The API has no
+        sorting or paging parameters, so every note is fetched (without its
+        content) and the page is cut locally; the cursor keeps pages stable
+        when notes are modified between requests.
+
+        Args:
+            limit: The maximum number of notes to return
+            cursor: The next_cursor of the previous page, or None for the first page
+
+        Returns:
+            NotesPage: The notes and a cursor for the next page (None on the last page)
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+            ValueError: If the cursor is malformed
+        """
+        # Check the cursor before making the request
+        if cursor:
+            decode_cursor(cursor)
+        notes = self.get_all_notes_without_content()
+        return paginate_recent_notes(notes, limit, cursor)
+
     def attach_note_to_parent(
         self,
         child_note_id: int,
@@ -394,7 +583,7 @@ class NoteAPI(API):
             hierarchy_type=hierarchy_type,
         )
 
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/notes/hierarchy/attach",
             headers={"Content-Type": "application/json"},
             data=request_data.model_dump_json(),
@@ -416,7 +605,7 @@ class NoteAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/notes/hierarchy",
             headers={"Content-Type": "application/json"},
         )
@@ -434,7 +623,7 @@ class NoteAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/notes/hierarchy/detach/{note_id}",
             headers={"Content-Type": "application/json"},
         )
@@ -454,7 +643,7 @@ class NoteAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/notes/search/fts",
             params={"q": query},
             headers={"Content-Type": "application/json"},
@@ -478,7 +667,7 @@ class NoteAPI(API):
             requests.exceptions.RequestException: If the request fails
             requests.exceptions.HTTPError: If the note is not found (404)
         """
-        response = requests.put(
+        response = self.session.put(
             f"{self.base_url}/notes/flat/{note_id}",
             headers={"Content-Type": "application/json"},
             data=request.model_dump_json(),
@@ -501,7 +690,7 @@ class NoteAPI(API):
             requests.exceptions.RequestException: If the request fails
             requests.exceptions.HTTPError: If the note is not found (404)
         """
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/notes/flat/{note_id}",
             headers={"Content-Type": "application/json"},
         )
@@ -532,7 +721,7 @@ class NoteAPI(API):
             ]
         }
 
-        response = requests.put(
+        response = self.session.put(
             f"{self.base_url}/notes/flat/batch",
             headers={"Content-Type": "application/json"},
             json=payload,
@@ -556,7 +745,7 @@ class NoteAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/notes/flat/{note_id}/backlinks",
             headers={"Content-Type": "application/json"},
         )
@@ -576,7 +765,7 @@ class NoteAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/notes/flat/{note_id}/forward-links",
             headers={"Content-Type": "application/json"},
         )
@@ -593,7 +782,7 @@ class NoteAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/notes/flat/link-edge-list",
             headers={"Content-Type": "application/json"},
         )
@@ -615,7 +804,7 @@ class NoteAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/notes/flat/render/{format}",
             headers={"Content-Type": "application/json"},
         )
@@ -639,7 +828,7 @@ class NoteAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/notes/flat/{note_id}/render/{format}",
             headers={"Content-Type": "application/json"},
         )
@@ -666,7 +855,7 @@ class NoteAPI(API):
         """
         request = RenderMarkdownRequest(content=content, format=format)
 
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/render/markdown",
             headers={"Content-Type": "application/json"},
             data=request.model_dump_json(exclude_none=True),
@@ -687,7 +876,7 @@ class NoteAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/notes/tree",
             headers={"Content-Type": "application/json"},
         )
@@ -697,8 +886,8 @@ class NoteAPI(API):
 
 
 class TagAPI(API):
-    def __init__(self, base_url: str):
-        super().__init__(base_url)
+    def __init__(self, base_url: str, session: Optional[requests.Session] = None):
+        super().__init__(base_url, session)
 
     def get_tag(self, tag_id: int) -> Tag:
         """
@@ -713,7 +902,7 @@ class TagAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/tags/{tag_id}",
             headers={"Content-Type": "application/json"},
         )
@@ -733,7 +922,7 @@ class TagAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/tags",
             headers={"Content-Type": "application/json"},
         )
@@ -757,7 +946,7 @@ class TagAPI(API):
         """
         request_data = CreateTagRequest(name=name)
 
-        response = requests.put(
+        response = self.session.put(
             f"{self.base_url}/tags/{tag_id}",
             headers={"Content-Type": "application/json"},
             data=request_data.model_dump_json(),
@@ -776,7 +965,7 @@ class TagAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/tags/{tag_id}",
             headers={"Content-Type": "application/json"},
         )
@@ -800,7 +989,7 @@ class TagAPI(API):
         """
         request_data = AttachTagRequest(note_id=note_id, tag_id=tag_id)
 
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/tags/notes",
             headers={"Content-Type": "application/json"},
             data=request_data.model_dump_json(),
@@ -823,7 +1012,7 @@ class TagAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/tags/notes/{note_id}/{tag_id}",
             headers={"Content-Type": "application/json"},
         )
@@ -842,7 +1031,7 @@ class TagAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/tags/notes",
             headers={"Content-Type": "application/json"},
         )
@@ -860,7 +1049,7 @@ class TagAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/tags/hierarchy",
             headers={"Content-Type": "application/json"},
         )
@@ -885,7 +1074,7 @@ class TagAPI(API):
         """
         request_data = AttachTagHierarchyRequest(child_id=child_id, parent_id=parent_id)
 
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/tags/hierarchy/attach",
             headers={"Content-Type": "application/json"},
             data=request_data.model_dump_json(),
@@ -903,7 +1092,7 @@ class TagAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/tags/hierarchy/detach/{tag_id}",
             headers={"Content-Type": "application/json"},
         )
@@ -925,7 +1114,7 @@ class TagAPI(API):
         """
         request_data = CreateTagRequest(name=name)
 
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/tags",
             headers={"Content-Type": "application/json"},
             data=request_data.model_dump_json(),
@@ -944,7 +1133,7 @@ class TagAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/tags/tree",
             headers={"Content-Type": "application/json"},
         )
@@ -954,8 +1143,8 @@ class TagAPI(API):
 
 
 class TaskAPI(API):
-    def __init__(self, base_url: str):
-        super().__init__(base_url)
+    def __init__(self, base_url: str, session: Optional[requests.Session] = None):
+        super().__init__(base_url, session)
 
     def get_task(self, task_id: int) -> Task:
         """
@@ -970,7 +1159,7 @@ class TaskAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/tasks/{task_id}",
             headers={"Content-Type": "application/json"},
         )
@@ -988,7 +1177,7 @@ class TaskAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/tasks",
             headers={"Content-Type": "application/json"},
         )
@@ -1006,7 +1195,7 @@ class TaskAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/tasks/hierarchy",
             headers={"Content-Type": "application/json"},
         )
@@ -1028,7 +1217,7 @@ class TaskAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.put(
+        response = self.session.put(
             f"{self.base_url}/tasks/{task_id}",
             headers={"Content-Type": "application/json"},
             data=task.model_dump_json(exclude_none=True),
@@ -1048,7 +1237,7 @@ class TaskAPI(API):
             requests.exceptions.RequestException: If the request fails
             requests.exceptions.HTTPError: If the task is not found (404)
         """
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/tasks/{task_id}",
             headers={"Content-Type": "application/json"},
         )
@@ -1068,7 +1257,7 @@ class TaskAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/tasks",
             headers={"Content-Type": "application/json"},
             data=task.model_dump_json(exclude_none=True),
@@ -1092,7 +1281,7 @@ class TaskAPI(API):
             child_task_id=child_id, parent_task_id=parent_id
         )
 
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/tasks/hierarchy/attach",
             headers={"Content-Type": "application/json"},
             data=request_data.model_dump_json(),
@@ -1110,7 +1299,7 @@ class TaskAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/tasks/hierarchy/detach/{task_id}",
             headers={"Content-Type": "application/json"},
         )
@@ -1127,7 +1316,7 @@ class TaskAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/tasks/tree",
             headers={"Content-Type": "application/json"},
         )
@@ -1137,15 +1326,26 @@ class TaskAPI(API):
 
 
 class AssetAPI(API):
-    def __init__(self, base_url: str):
-        super().__init__(base_url)
+    def __init__(self, base_url: str, session: Optional[requests.Session] = None):
+        super().__init__(base_url, session)
 
-    def upload_asset(self, file_path: str | Path | BinaryIO) -> Asset:
+    def upload_asset(
+        self,
+        file_path: str | Path | BinaryIO,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> Asset:
         """
         Upload a file as an asset
 
+        The file is streamed to the API, so large files are never held in
+        memory or copied to disk first.
+
         Args:
-            file_path: Path to the file to upload or file-like object
+            file_path: Path to the file to upload or seekable file-like object
+            filename: Name to store the asset under, defaults to the
+                basename of the file
+            content_type: MIME type of the file
 
         Returns:
             Asset: The created asset data
@@ -1156,16 +1356,70 @@ class AssetAPI(API):
         """
         if isinstance(file_path, (str, Path)):
             with open(file_path, "rb") as f:
-                files = {"file": f}
-                response = requests.post(f"{self.base_url}/assets", files=files)
-        else:
-            # Handle file-like object
-            files = {"file": file_path}
-            response = requests.post(f"{self.base_url}/assets", files=files)
+                return self.upload_asset(f, filename, content_type)
+
+        if filename is None:
+            # Temporary files may be named by their file descriptor
+            name = getattr(file_path, "name", None)
+            filename = os.path.basename(name) if isinstance(name, str) else "upload"
+        # Reads the file as the request is sent, unlike files= in requests
+        # which builds the whole body in memory
+        body = MultipartEncoder(
+            fields={
+                "file": (
+                    filename,
+                    file_path,
+                    content_type or "application/octet-stream",
+                )
+            }
+        )
+        response = self.session.post(
+            f"{self.base_url}/assets",
+            data=body,
+            headers={"Content-Type": body.content_type},
+        )
 
         response.raise_for_status()
         return Asset.model_validate(response.json())
 
+    def upload_assets(
+        self, files: list[UploadFile], max_workers: int = DEFAULT_UPLOAD_WORKERS
+    ) -> list[AssetUploadResult]:
+        """
+        Upload many files as assets concurrently
+
+        A failed upload does not stop the others, its error is recorded in
+        the result for that file instead.
+
+        Args:
+            files: Paths, or (filename, file object, content type) triples
+            max_workers: Maximum number of uploads in flight at once, this
+                         should not exceed the pool size of the session
+
+        Returns:
+            list[AssetUploadResult]: The result of each file, in the order given
+        """
+
+        def upload(file: UploadFile) -> AssetUploadResult:
+            if isinstance(file, (str, Path)):
+                filename, args = os.path.basename(file), (file,)
+            else:
+                filename, args = file[0], (file[1], file[0], file[2])
+            try:
+                return AssetUploadResult(
+                    filename=filename, asset=self.upload_asset(*args)
+                )
+            except (requests.exceptions.RequestException, OSError, ValueError) as e:
+                return AssetUploadResult(filename=filename, error=str(e))
+
+        if not files:
+            return []
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(files)),
+            thread_name_prefix="asset-upload",
+        ) as executor:
+            return list(executor.map(upload, files))
+
     def get_all_assets(self) -> list[Asset]:
         """
         Get all assets
@@ -1176,7 +1430,7 @@ class AssetAPI(API):
         Raises:
             requests.exceptions.RequestException: If the request fails
         """
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/assets",
             headers={"Content-Type": "application/json"},
         )
@@ -1184,6 +1438,42 @@ class AssetAPI(API):
         response.raise_for_status()
         return [Asset.model_validate(asset) for asset in response.json()]
 
+    def get_assets(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        note_id: Optional[int] = None,
+        mime_type: Optional[str] = None,
+        order: Literal["asc", "desc"] = "desc",
+    ) -> AssetsPage:
+        """
+        Get a page of assets, optionally filtered
+
+        Assets are ordered by created_at (then id). The API has no filtering
+        or paging parameters, so every asset is fetched and the page is cut
+        locally; the keyset cursor keeps pages stable as assets are added.
+
+        Args:
+            limit: The maximum number of assets to return
+            cursor: The next_cursor of the previous page, or None for the first page
+            note_id: Only return assets attached to this note
+            mime_type: Only return assets of this MIME type, either in full
+                       (image/png) or only the major type (image)
+            order: "desc" for the newest assets first, "asc" for the oldest
+
+        Returns:
+            AssetsPage: The assets and a cursor for the next page (None on the last page)
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+            ValueError: If the cursor is malformed
+        """
+        # Check the cursor before making the request
+        if cursor:
+            decode_cursor(cursor)
+        assets = self.get_all_assets()
+        return paginate_assets(assets, limit, cursor, note_id, mime_type, order)
+
     def update_asset(self, asset_id: int, request: UpdateAssetRequest) -> Asset:
         """
         Update an asset's metadata
@@ -1199,7 +1489,7 @@ class AssetAPI(API):
             requests.exceptions.RequestException: If the request fails
             requests.exceptions.HTTPError: If the asset is not found (404)
         """
-        response = requests.put(
+        response = self.session.put(
             f"{self.base_url}/assets/{asset_id}",
             headers={"Content-Type": "application/json"},
             data=request.model_dump_json(exclude_none=True),
@@ -1219,7 +1509,7 @@ class AssetAPI(API):
             requests.exceptions.RequestException: If the request fails
             requests.exceptions.HTTPError: If the asset is not found (404)
         """
-        response = requests.delete(
+        response = self.session.delete(
             f"{self.base_url}/assets/{asset_id}",
             headers={"Content-Type": "application/json"},
         )
@@ -1242,14 +1532,39 @@ class AssetAPI(API):
             requests.exceptions.RequestException: If the request fails
             requests.exceptions.HTTPError: If the asset is not found (404)
         """
+        with self.open_asset(asset_id) as response:
+            response.raise_for_status()
+
+            with open(output_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk)
+
+    def open_asset(
+        self,
+        asset_id: int | str,
+        headers: Optional[dict[str, str]] = None,
+    ) -> requests.Response:
+        """
+        Open a streaming download of an asset by its ID or filename
+
+        The body is not read, the caller must consume it (e.g. with
+        `iter_content` or `raw.stream`) and close the response to release
+        the connection back to the pool. The status is not checked so that
+        callers such as proxies can forward error responses.
+
+        Args:
+            asset_id: The ID of the asset to download or its filename (e.g. 'icon.png')
+            headers: Extra request headers, e.g. Range or conditional headers
+
+        Returns:
+            requests.Response: The open response
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+        """
         endpoint = (
             f"{self.base_url}/assets/download/{asset_id}"
             if isinstance(asset_id, str)
             else f"{self.base_url}/assets/{asset_id}"
         )
-        response = requests.get(endpoint, stream=True)
-        response.raise_for_status()
-
-        with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        return self.session.get(endpoint, headers=headers, stream=True)
@@ -0,0 +1,192 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from pydantic import BaseModel
+
+
+class CachedAsset(BaseModel):
+    name: str
+    digest: str
+    size: int
+    content_type: Optional[str] = None
+    # Validators from the API, used to revalidate the entry
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+    fetched_at: float
+
+
+class AssetCache:
+    """
+    A content-addressed cache of assets on local disk.
+
+    Asset bodies are stored under `objects/` by their SHA-256 digest, and an
+    index entry under `index/` maps each asset name to its body. The cache is
+    bounded by `max_bytes`, evicting the least recently used entries first.
+    Writes are atomic renames, so the directory can be shared by several
+    worker processes.
+
+    Rather than scanning the index on every store, each process tracks an
+    estimate of the total size from its last scan plus what it has stored
+    since, and only scans once that exceeds `max_bytes`. Stores by other
+    processes are not counted, so the cache can briefly exceed its bound by
+    what they stored since their own last scan.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int,
+        max_entry_bytes: Optional[int] = None,
+        revalidate_after: float = 3600,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        # Don't let a single large video evict everything else
+        self.max_entry_bytes = (
+            max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        )
+        self.revalidate_after = revalidate_after
+        self.objects_dir = self.directory / "objects"
+        self.index_dir = self.directory / "index"
+        self.tmp_dir = self.directory / "tmp"
+        for d in (self.objects_dir, self.index_dir, self.tmp_dir):
+            d.mkdir(parents=True, exist_ok=True)
+        # Eviction frees space down to this, so not every store needs a scan
+        self.low_water_bytes = int(max_bytes * 0.9)
+        # Unknown until the first scan
+        self._estimated_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _index_path(self, name: str) -> Path:
+        key = hashlib.sha256(name.encode()).hexdigest()
+        return self.index_dir / f"{key}.json"
+
+    def object_path(self, entry: CachedAsset) -> Path:
+        return self.objects_dir / entry.digest
+
+    def lookup(self, name: str) -> Optional[CachedAsset]:
+        """Get the entry for an asset, marking it as recently used"""
+        index_path = self._index_path(name)
+        try:
+            entry = CachedAsset.model_validate_json(index_path.read_bytes())
+            if not self.object_path(entry).exists():
+                return None
+            # The mtime of the index entry records when it was last used
+            os.utime(index_path)
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: CachedAsset) -> bool:
+        return time.time() - entry.fetched_at < self.revalidate_after
+
+    def refresh(self, entry: CachedAsset) -> None:
+        """Mark an entry as revalidated against the API"""
+        entry.fetched_at = time.time()
+        self._write_entry(entry)
+
+    def evict(self, name: str) -> None:
+        self._index_path(name).unlink(missing_ok=True)
+
+    def tee(
+        self,
+        name: str,
+        chunks: Iterable[bytes],
+        content_type: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[datetime] = None,
+    ) -> Iterator[bytes]:
+        """
+        Yield chunks of an asset while writing them to the cache.
+
+        The entry is only stored once the stream has been read to the end,
+        so an interrupted download never leaves a partial asset behind.
+        """
+        fd, tmp_name = tempfile.mkstemp(dir=self.tmp_dir)
+        digest = hashlib.sha256()
+        size = 0
+        completed = False
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                    yield chunk
+            completed = True
+        finally:
+            if completed and size <= self.max_entry_bytes:
+                entry = CachedAsset(
+                    name=name,
+                    digest=digest.hexdigest(),
+                    size=size,
+                    content_type=content_type,
+                    etag=etag,
+                    last_modified=last_modified,
+                    fetched_at=time.time(),
+                )
+                os.replace(tmp_name, self.object_path(entry))
+                self._write_entry(entry)
+                self._stored(size)
+            else:
+                os.unlink(tmp_name)
+
+    def _write_entry(self, entry: CachedAsset) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=self.tmp_dir)
+        with os.fdopen(fd, "w") as f:
+            f.write(entry.model_dump_json())
+        os.replace(tmp_name, self._index_path(entry.name))
+
+    def _stored(self, size: int) -> None:
+        with self._lock:
+            if self._estimated_bytes is not None:
+                self._estimated_bytes += size
+                if self._estimated_bytes <= self.max_bytes:
+                    return
+        self.evict_lru()
+
+    def evict_lru(self) -> None:
+        """
+        Evict the least recently used entries if the cache exceeds max_bytes.
+
+        Entries are evicted down to a fraction of max_bytes, leaving room for
+        further stores before the next scan.
+        """
+        entries = []
+        for index_path in self.index_dir.iterdir():
+            try:
+                entry = CachedAsset.model_validate_json(index_path.read_bytes())
+                entries.append((index_path.stat().st_mtime, index_path, entry))
+            except (OSError, ValueError):
+                index_path.unlink(missing_ok=True)
+
+        # Bodies are shared by every name with the same content
+        sizes = {entry.digest: entry.size for _, _, entry in entries}
+        total = sum(sizes.values())
+        refcounts: dict[str, int] = {}
+        for _, _, entry in entries:
+            refcounts[entry.digest] = refcounts.get(entry.digest, 0) + 1
+
+        target = self.max_bytes if total <= self.max_bytes else self.low_water_bytes
+        for _, index_path, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= target:
+                break
+            index_path.unlink(missing_ok=True)
+            refcounts[entry.digest] -= 1
+            if refcounts[entry.digest] == 0:
+                self.object_path(entry).unlink(missing_ok=True)
+                total -= entry.size
+
+        # Remove bodies no longer referenced by any entry
+        for object_path in self.objects_dir.iterdir():
+            if refcounts.get(object_path.name, 0) == 0:
+                object_path.unlink(missing_ok=True)
+
+        with self._lock:
+            self._estimated_bytes = total
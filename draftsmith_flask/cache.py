@@ -0,0 +1,236 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, TypeVar
+
+from flask import g, has_request_context
+
+T = TypeVar("T")
+
+
+class RequestCache:
+    """
+    Memoizes values for the lifetime of a single Flask request.
+
+    Context processors and views often need the same data from the API
+    (e.g. the tags tree or backlinks), this allows each distinct resource
+    to be fetched once per request. Calls fanned out to other threads that
+    need a value already being fetched wait for it rather than refetching.
+    """
+
+    def __init__(self):
+        self.values: dict[Hashable, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending: dict[Hashable, Future] = {}
+
+    def get_or_set(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self.values:
+                self.hits += 1
+                return self.values[key]
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                self.misses += 1
+                pending = self._pending[key] = Future()
+            else:
+                self.hits += 1
+        if not owner:
+            return pending.result()
+
+        try:
+            value = fn()
+        except BaseException as e:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            # Unless cleared by a write while the value was fetched
+            if self._pending.pop(key, None) is pending:
+                self.values[key] = value
+        pending.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self.values.clear()
+            self._pending.clear()
+
+
+def request_cache() -> RequestCache:
+    """
+    Get the cache for the current request, creating it if needed
+
+    Apps should create it in a before_request hook, as threads sharing the
+    request may otherwise race to create it; setdefault keeps the first.
+    """
+    if "request_cache" not in g:
+        g.setdefault("request_cache", RequestCache())
+    return g.request_cache
+
+
+class RequestMemo:
+    """
+    Wraps an API client so that reads are memoized for the current request.
+
+    Methods starting with `get_` or `search_` are treated as reads and cached
+    by their arguments, any other method is treated as a write and clears the
+    cache so that later reads within the request observe the change.
+    Outside of a request context the client is called directly.
+    """
+
+    READ_PREFIXES = ("get_", "search_")
+
+    def __init__(self, api):
+        self._api = api
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._api, name)
+        if not callable(attr) or not has_request_context():
+            return attr
+
+        if not name.startswith(self.READ_PREFIXES):
+
+            @functools.wraps(attr)
+            def write(*args, **kwargs):
+                try:
+                    return attr(*args, **kwargs)
+                finally:
+                    request_cache().clear()
+
+            return write
+
+        @functools.wraps(attr)
+        def read(*args, **kwargs):
+            key = (type(self._api).__name__, name, args, tuple(sorted(kwargs.items())))
+            return request_cache().get_or_set(key, lambda: attr(*args, **kwargs))
+
+        return read
+
+
+class TTLCache:
+    """
+    A process-wide cache where each entry expires after `ttl` seconds.
+
+    Entries can also be invalidated explicitly, e.g. after a mutation, so the
+    TTL only bounds staleness from changes made by other workers or clients.
+    Values are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        # Bumped on invalidation so values fetched before it are not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_set(self, key: Hashable, fn: Callable[[], T]) -> T:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+        value = fn()
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop a single entry, or every entry if no key is given"""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+class LRUCache:
+    """
+    A process-wide cache bounded by the total size of its values.
+
+    When a new value would exceed `max_size`, the least recently used
+    entries are evicted first. Values larger than `max_size` on their own
+    are returned but not stored. Entries also expire after `ttl` seconds,
+    if given. As with TTLCache, values are shared between requests and must
+    be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        sizeof: Callable[[Any], int] = len,
+        ttl: float | None = None,
+    ):
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self.size = 0
+        # Each entry is its expiry (or None), size and value
+        self._entries: OrderedDict[Hashable, tuple[float | None, int, Any]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_set(self, key: Hashable, fn: Callable[[], T]) -> T:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            generation = self._generation
+        value = fn()
+        size = self.sizeof(value)
+        expires = None if self.ttl is None else now + self.ttl
+        with self._lock:
+            if generation == self._generation and size <= self.max_size:
+                self._remove(key)
+                self._entries[key] = (expires, size, value)
+                self.size += size
+                while self.size > self.max_size:
+                    self._remove(next(iter(self._entries)))
+        return value
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop a single entry, or every entry if no key is given"""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+                self.size = 0
+            else:
+                self._remove(key)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size": self.size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+            }
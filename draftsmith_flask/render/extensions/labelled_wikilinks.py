@@ -1,13 +1,60 @@
 import markdown
 from markdown.inlinepatterns import InlineProcessor
 from markdown.extensions import Extension
+from markdown.preprocessors import Preprocessor
 import xml.etree.ElementTree as etree
 import re
 from flask import abort
-from api_old.get.notes import get_note
+from api_old.get.notes import get_notes
+from render.extensions.transclusions import CODE_SPAN_PATTERN
+
+# Regular expression for matching the custom syntax [[ID]] or [[ID|label]]
+# It should match either [[number]] or [[number|text]]
+NOTE_LINK_RE = r"\[\[(\d+(?:\|[^]]+)?)\]\]"
+
+
+def fetch_titles(note_ids: set[int]) -> dict[int, str]:
+    """Fetch the titles of notes in one request, omitting notes that can't be found"""
+    if not note_ids:
+        return {}
+    try:
+        notes = get_notes()
+    except Exception:
+        return {}
+    return {note.id: note.title for note in notes if note.id in note_ids}
+
+
+class NoteLinkTitlesPreprocessor(Preprocessor):
+    """Resolve the titles of every unlabelled link in the document at once"""
+
+    def __init__(self, md, extension: "NoteLinkExtension"):
+        super().__init__(md)
+        self.extension = extension
+        self.pattern = re.compile(NOTE_LINK_RE)
+
+    def run(self, lines):
+        note_ids = set()
+        code_block = False
+        for line in lines:
+            # Links in code are not rendered, so their titles aren't needed
+            if line.strip().startswith("```"):
+                code_block = not code_block
+                continue
+            if code_block:
+                continue
+            for m in self.pattern.finditer(CODE_SPAN_PATTERN.sub("", line)):
+                # Labelled links don't need the title
+                if "|" not in m.group(1):
+                    note_ids.add(int(m.group(1)))
+        self.extension.titles = fetch_titles(note_ids)
+        return lines
 
 
 class NoteLinkInlineProcessor(InlineProcessor):
+    def __init__(self, pattern, md, extension: "NoteLinkExtension"):
+        super().__init__(pattern, md)
+        self.extension = extension
+
     def handleMatch(self, m, data):
         try:
             # Extract the Components
@@ -15,9 +62,9 @@ class NoteLinkInlineProcessor(InlineProcessor):
             note_id = int(parts[0])
             label = parts[1] if len(parts) > 1 else None
 
-            # Get the note and extract the attributes
-            note = get_note(note_id)
-            title = note.title
+            # Take the title from those resolved for the document
+            if not label:
+                title = self.extension.titles[note_id]
 
             # Set the label and URL
             label = label if label else title if title else f"# {note_id}"
@@ -36,12 +83,17 @@ class NoteLinkInlineProcessor(InlineProcessor):
 
 
 class NoteLinkExtension(Extension):
+    def __init__(self, **kwargs):
+        # The titles of the notes linked from the current document
+        self.titles: dict[int, str] = {}
+        super().__init__(**kwargs)
+
     def extendMarkdown(self, md):
-        # Regular expression for matching the custom syntax [[ID]] or [[ID|label]]
-        # It should match either [[number]] or [[number|text]]
-        NOTE_LINK_RE = r"\[\[(\d+(?:\|[^]]+)?)\]\]"
+        md.preprocessors.register(
+            NoteLinkTitlesPreprocessor(md, self), "note_link_titles", 20
+        )
         md.inlinePatterns.register(
-            NoteLinkInlineProcessor(NOTE_LINK_RE, md), "note_link", 175
+            NoteLinkInlineProcessor(NOTE_LINK_RE, md, self), "note_link", 175
         )
 
 
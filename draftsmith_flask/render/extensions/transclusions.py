@@ -3,12 +3,16 @@ import markdown
 from markdown.extensions import Extension
 from markdown.preprocessors import Preprocessor
 import re
+from concurrent.futures import ThreadPoolExecutor
 from re import Pattern
 from api_old.get.notes import get_notes, get_note
 from render.math_store import MathStore
 from render.regex_patterns import TRANSCLUSION_PATTERN
 
 MAX_DEPTH = 10
+# Transcluded notes fetched at once while prefetching
+PREFETCH_WORKERS = 8
+CODE_SPAN_PATTERN = re.compile(r"(`+)(.*?)\1")  # Match inline code spans
 
 
 class IncludeFilePreprocessor(Preprocessor):
@@ -19,6 +23,142 @@ class IncludeFilePreprocessor(Preprocessor):
         self.max_depth = max_depth
         self.math_store = MathStore()
         self.inject_daisy_card_css = inject_daisy_card_css
+        # The HTML of each note included in the current document, so a note
+        # embedded many times is only fetched and rendered once
+        self.included_html: dict[int, str] = {}
+        # Notes fetched ahead of expansion by prefetch_notes
+        self.fetched_notes: dict[int, object] = {}
+        # The notes currently being included, outermost first
+        self.inclusion_stack: list[int] = []
+        # Notes on the stack whose HTML depends on where they are included,
+        # as they hit a cycle or the depth limit, so they are not reused
+        self.position_dependent: set[int] = set()
+        self._included_md = None
+
+    def reset(self):
+        """Forget the notes and math included in the last document"""
+        self.math_store = MathStore()
+        self.included_html = {}
+        self.fetched_notes = {}
+        self.inclusion_stack = []
+        self.position_dependent = set()
+
+    def included_md(self) -> markdown.Markdown:
+        """The Markdown instance that converts included notes, built on first use"""
+        if self._included_md is None:
+            # Transclusions are expanded by this preprocessor before conversion
+            self._included_md = markdown.Markdown(
+                extensions=[
+                    ext
+                    for ext in self.md.registeredExtensions
+                    if not isinstance(ext, IncludeTransclusions)
+                ]
+            )
+        return self._included_md
+
+    def include_note(self, note_id: int, depth: int) -> str:
+        """
+        Render a note to include, reusing it if it was already included.
+
+        Raises:
+            Exception: If the note could not be fetched
+        """
+        if note_id in self.inclusion_stack:
+            self.position_dependent.update(self.inclusion_stack)
+            cycle = [*self.inclusion_stack, note_id]
+            cycle = cycle[cycle.index(note_id) :]
+            path = " → ".join(f"#{i}" for i in cycle)
+            return f"**Error:** Transclusion cycle {path}."
+
+        if note_id in self.included_html:
+            return self.included_html[note_id]
+
+        self.inclusion_stack.append(note_id)
+        try:
+            html = self.render_note(note_id, depth)
+        finally:
+            self.inclusion_stack.pop()
+            position_dependent = note_id in self.position_dependent
+            self.position_dependent.discard(note_id)
+        # Included elsewhere, the cycle or cut off subtree would differ
+        if not position_dependent:
+            self.included_html[note_id] = html
+        return html
+
+    def find_transclusion_ids(self, lines: list[str]) -> set[int]:
+        """The ids of the notes transcluded by lines, outside of code"""
+        ids = set()
+        code_block = False
+        for line in lines:
+            if line.strip().startswith("```"):
+                code_block = not code_block
+                continue
+            if code_block:
+                continue
+            m = self.TRANSCLUSION_PATTERN.search(CODE_SPAN_PATTERN.sub("", line))
+            if m and m.group(1).isdigit():
+                ids.add(int(m.group(1)))
+        return ids
+
+    def prefetch_notes(self, lines: list[str]):
+        """
+        Fetch every note the document transcludes before expanding them.
+
+        Each level of transclusions is fetched concurrently, so the number
+        of sequential round trips is the depth of the inclusions rather than
+        the number of notes. Notes that fail to fetch are left for
+        include_note to report.
+        """
+
+        def fetch(note_id: int):
+            try:
+                return get_note(note_id)
+            except Exception:
+                return None
+
+        pending = self.find_transclusion_ids(lines)
+        if not pending:
+            return
+        attempted = set()
+        with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+            for _ in range(self.max_depth):
+                pending -= attempted
+                if not pending:
+                    break
+                attempted |= pending
+                ids = sorted(pending)
+                pending = set()
+                for note_id, note in zip(ids, executor.map(fetch, ids)):
+                    if note is not None:
+                        self.fetched_notes[note_id] = note
+                        lines = note.content.splitlines()
+                        pending |= self.find_transclusion_ids(lines)
+
+    def render_note(self, note_id: int, depth: int) -> str:
+        note = self.fetched_notes.get(note_id) or get_note(note_id)
+        file_content = note.content
+
+        # Preserve math in the file content
+        preserved_content = self.math_store.preserve_math(file_content)
+
+        # Expand the note's own transclusions one level deeper
+        included_lines = self.run(preserved_content.splitlines(), depth + 1)
+
+        # Convert and restore math environments, the instance is shared by
+        # every included note, each is converted after its own inclusions
+        included_md = self.included_md()
+        try:
+            included_html = included_md.convert("\n".join(included_lines))
+        finally:
+            included_md.reset()
+        restored_html = self.math_store.restore_math(included_html)
+
+        if self.inject_daisy_card_css:
+            restored_html = self.wrap_with_css(
+                f"<a href='/note/{note_id}'>↱ #{note_id}</a><span class='text-sm text-gray-500'> | <a href='/edit/{note_id}'>Edit</a></span>",
+                restored_html,
+            )
+        return restored_html
 
     def wrap_with_css(self, title: str, content: str) -> str:
         return f"""
@@ -33,11 +173,14 @@ class IncludeFilePreprocessor(Preprocessor):
 
     def run(self, lines, depth=0):
         if depth >= self.max_depth:
+            if self.find_transclusion_ids(lines):
+                self.position_dependent.update(self.inclusion_stack)
             return lines  # Return the original lines if max depth is reached
+        if depth == 0:
+            self.prefetch_notes(lines)
 
         new_lines = []
         code_block = False
-        code_span_pattern = re.compile(r"(`+)(.*?)\1")  # Match inline code spans
 
         for line in lines:
             # Detect code blocks (fenced with triple backticks)
@@ -53,7 +196,7 @@ class IncludeFilePreprocessor(Preprocessor):
 
             # Process inline code spans and protect them
             protected_line = line
-            inline_code_matches = list(code_span_pattern.finditer(line))
+            inline_code_matches = list(CODE_SPAN_PATTERN.finditer(line))
             for match in inline_code_matches:
                 protected_segment = match.group(0)  # Full match with backticks
                 # Temporarily replace inline code with a placeholder
@@ -67,37 +210,8 @@ class IncludeFilePreprocessor(Preprocessor):
                 id = m.group(1)
                 if id.isdigit():
                     try:
-                        note = get_note(int(id))
-                        file_content = note.content
-
-                        # Preserve math in the file content
-                        preserved_content = self.math_store.preserve_math(file_content)
-
-                        # Create a new Markdown instance and parse the included file's content
-                        included_md = markdown.Markdown(
-                            extensions=self.md.registeredExtensions
-                        )
-
-                        # Increase the depth for this recursion level
-                        included_preprocessor = IncludeFilePreprocessor(
-                            included_md, self.max_depth
-                        )
-                        included_lines = included_preprocessor.run(
-                            preserved_content.splitlines(), depth + 1
-                        )
-
-                        # Convert and restore math environments
-                        included_html = included_md.convert("\n".join(included_lines))
-                        restored_html = self.math_store.restore_math(included_html)
-
-                        if self.inject_daisy_card_css:
-                            restored_html = self.wrap_with_css(
-                                f"<a href='/note/{id}'>↱ #{id}</a><span class='text-sm text-gray-500'> | <a href='/edit/{id}'>Edit</a></span>",
-                                restored_html,
-                            )
-
                         # Add the parsed HTML to new_lines
-                        new_lines.append(restored_html)
+                        new_lines.append(self.include_note(int(id), depth))
                     except Exception as e:
                         new_lines.append(f"**Error:** Unable to find ID #`{id}`.")
                         new_lines.append(f"**Error:** {e}")
@@ -123,9 +237,13 @@ class IncludeTransclusions(Extension):
         super().__init__(**kwargs)
 
     def extendMarkdown(self, md):
-        md.preprocessors.register(
-            IncludeFilePreprocessor(md, max_depth=MAX_DEPTH), "include_file", 25
-        )
+        self.preprocessor = IncludeFilePreprocessor(md, max_depth=MAX_DEPTH)
+        md.preprocessors.register(self.preprocessor, "include_file", 25)
+        # Registered extensions are reset by Markdown.reset()
+        md.registerExtension(self)
+
+    def reset(self):
+        self.preprocessor.reset()
 
 
 def test_regex(reg_pattern: Pattern[str]):
@@ -1,5 +1,11 @@
+import re
+
 from render.regex_patterns import INLINE_MATH_PATTERN, BLOCK_MATH_PATTERN
 
+# The trailing delimiter keeps MATH_PLACEHOLDER_1 from matching a prefix of
+# MATH_PLACEHOLDER_10, and text that follows a placeholder from joining it
+PLACEHOLDER_PATTERN = re.compile(r"MATH_PLACEHOLDER_(\d+)_END")
+
 
 class MathStore:
     """
@@ -24,12 +30,16 @@ class MathStore:
 
     def _preserve_math(self, match):
         math = match.group(0)
-        placeholder = f"MATH_PLACEHOLDER_{len(self.math_blocks)}"
+        placeholder = f"MATH_PLACEHOLDER_{len(self.math_blocks)}_END"
         self.math_blocks.append(math)
         return placeholder
 
     def _restore_math(self, text):
-        for i, math in enumerate(self.math_blocks):
-            placeholder = f"MATH_PLACEHOLDER_{i}"
-            text = text.replace(placeholder, math)
-        return text
+        # Replace every placeholder in a single pass over the text
+        return PLACEHOLDER_PATTERN.sub(self._lookup_math, text)
+
+    def _lookup_math(self, match):
+        i = int(match.group(1))
+        if i < len(self.math_blocks):
+            return self.math_blocks[i]
+        return match.group(0)
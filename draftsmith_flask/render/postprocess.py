@@ -1,3 +1,5 @@
+from typing import Iterable
+
 from bs4 import BeautifulSoup
 
 
@@ -47,3 +49,34 @@ def fix_image_video_tags(html) -> str:
             img.decompose()
 
     return str(soup)
+
+
+# Images the asset proxy can serve resized variants of, with `?w=<width>`
+resizable_image_extensions = {"jpg", "jpeg", "png", "webp"}
+
+
+def add_image_srcset(
+    html: str,
+    widths: Iterable[int] = (320, 640, 1280),
+    sizes: str = "(max-width: 768px) 100vw, 768px",
+) -> str:
+    """Let the browser pick a resized variant of images served from /m/"""
+    widths = tuple(widths)
+    if not widths or "<img" not in html:
+        return html
+    soup = BeautifulSoup(html, "html.parser")
+
+    for img in soup.find_all("img"):
+        src = img.get("src", "")
+        if not src.startswith("/m/") or "?" in src or img.has_attr("srcset"):
+            continue
+        if src.split(".")[-1].lower() not in resizable_image_extensions:
+            continue
+
+        # The original stays in src for browsers without srcset support
+        img["srcset"] = ", ".join(f"{src}?w={w} {w}w" for w in widths)
+        img["sizes"] = sizes
+        if not img.has_attr("loading"):
+            img["loading"] = "lazy"
+
+    return str(soup)
@@ -1,3 +1,9 @@
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
 import markdown
 
 # from markdown_extension_transclusion import IncludeFileExtension
@@ -7,52 +13,95 @@ from pathlib import Path
 from render.extensions.transclusions import IncludeTransclusions
 from render.math_store import MathStore
 from render.extensions.labelled_wikilinks import NoteLinkExtension
-from render.postprocess import fix_image_video_tags
+from render.postprocess import add_image_srcset, fix_image_video_tags
+from thumbnails import SRCSET_WIDTHS
 
 # from regex_patterns import INLINE_MATH_PATTERN, BLOCK_MATH_PATTERN
 
 
-def make_html(text: str) -> str:
-    html_body = markdown.markdown(
-        text,
-        extensions=[
-            IncludeTransclusions(),
-            NoteLinkExtension(),
-            "attr_list",
-            # "markdown_captions",
-            "def_list",
-            "nl2br",
-            "toc",
-            "sane_lists",
-            "pymdownx.tasklist",
-            "pymdownx.inlinehilite",
-            "pymdownx.blocks.tab",
-            "abbr",
-            "md_in_html",
-            "markdown_gfm_admonition",
-            "codehilite",
-            "fenced_code",
-            "tables",
-            "pymdownx.superfences",
-            "pymdownx.blocks.details",
-            "admonition",
-            "toc",
-            # TODO Make base_url configurable to share between preview and editor
-            # WikiLinkExtension(base_url=os.getcwd() + os.path.sep, end_url=".md"),
-            "md_in_html",
-            "footnotes",
-            "meta",
-            IncludeTransclusions(),
-        ],
-        extension_configs={
-            "codehilite": {
-                "css_class": "highlight",
-                "linenums": False,
-                "guess_lang": False,
-            }
-        },
+# Extensions that take no per-instance state, see build_markdown
+EXTENSIONS = [
+    "attr_list",
+    # ImageWithFigureExtension(),
+    # "markdown_captions",
+    "def_list",
+    "nl2br",
+    "toc",
+    "sane_lists",
+    "pymdownx.tasklist",
+    "pymdownx.inlinehilite",
+    "pymdownx.blocks.tab",
+    "abbr",
+    "md_in_html",
+    "markdown_gfm_admonition",
+    "codehilite",
+    "fenced_code",
+    "tables",
+    "pymdownx.superfences",
+    "pymdownx.blocks.details",
+    "admonition",
+    "toc",
+    # TODO Make base_url configurable to share between preview and editor
+    # WikiLinkExtension(base_url=os.getcwd() + os.path.sep, end_url=".md"),
+    "md_in_html",
+    "footnotes",
+    "meta",
+]
+
+EXTENSION_CONFIGS = {
+    "codehilite": {
+        "css_class": "highlight",
+        "linenums": False,
+        "guess_lang": False,
+    }
+}
+
+
+def build_markdown() -> markdown.Markdown:
+    return markdown.Markdown(
+        extensions=[IncludeTransclusions(), NoteLinkExtension(), *EXTENSIONS],
+        extension_configs=EXTENSION_CONFIGS,
     )
 
+
+class MarkdownPool:
+    """
+    A pool of configured Markdown instances, shared between threads.
+
+    Building a Markdown instance loads and wires up every extension, which
+    costs more than converting a typical note. Instances are instead reused,
+    each held by one thread at a time and reset before it is returned.
+    The pool grows to the number of concurrent renders.
+    """
+
+    def __init__(self, factory: Callable[[], markdown.Markdown] = build_markdown):
+        self.factory = factory
+        # Last in first out, so the most recently used instances stay warm
+        self._instances: queue.LifoQueue[markdown.Markdown] = queue.LifoQueue()
+
+    @contextmanager
+    def acquire(self) -> Iterator[markdown.Markdown]:
+        try:
+            md = self._instances.get_nowait()
+        except queue.Empty:
+            md = self.factory()
+        try:
+            yield md
+        finally:
+            md.reset()
+            self._instances.put(md)
+
+    def convert(self, text: str) -> str:
+        with self.acquire() as md:
+            return md.convert(text)
+
+
+markdown_pool = MarkdownPool()
+
+
+def make_html(text: str) -> str:
+    html_body = markdown_pool.convert(text)
+
     # return f"<div class='markdown'>{html_body}</div>"
     return html_body
 
@@ -71,51 +120,14 @@ class Markdown:
         text = self.math_store.preserve_math(self.text)
 
         # Generate the markdown with extensions
-        html_body = markdown.markdown(
-            text,
-            extensions=[
-                IncludeTransclusions(),
-                NoteLinkExtension(),
-                "attr_list",
-                # ImageWithFigureExtension(),
-                # "markdown_captions",
-                "def_list",
-                "nl2br",
-                "toc",
-                "sane_lists",
-                "pymdownx.tasklist",
-                "pymdownx.inlinehilite",
-                "pymdownx.blocks.tab",
-                "abbr",
-                "md_in_html",
-                "markdown_gfm_admonition",
-                "codehilite",
-                "fenced_code",
-                "tables",
-                "pymdownx.superfences",
-                "pymdownx.blocks.details",
-                "admonition",
-                "toc",
-                # TODO Make base_url configurable to share between preview and editor
-                # WikiLinkExtension(base_url=os.getcwd() + os.path.sep, end_url=".md"),
-                "md_in_html",
-                "footnotes",
-                "meta",
-            ],
-            extension_configs={
-                "codehilite": {
-                    "css_class": "highlight",
-                    "linenums": False,
-                    "guess_lang": False,
-                }
-            },
-        )
+        html_body = markdown_pool.convert(text)
 
         # Restore math environments
         html_body = self.math_store.restore_math(html_body)
 
         # Postprocess the HTML
         html_body = fix_image_video_tags(html_body)
+        html_body = add_image_srcset(html_body, widths=SRCSET_WIDTHS)
 
         return html_body
 
@@ -222,3 +234,39 @@ class Markdown:
         """
 
         return html
+
+
+def _render_note(text: str) -> str:
+    return Markdown(text).make_html()
+
+
+def render_many(
+    texts: Iterable[str],
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+) -> list[str]:
+    """
+    Render many notes to HTML using a pool of processes
+
+    Rendering is CPU bound, so separate processes are needed to use more
+    than one core. Each worker keeps its own pool of Markdown instances.
+
+    Args:
+        texts: The Markdown of each note
+        max_workers: Number of processes, defaults to the number of CPUs
+        chunksize: Notes sent to a worker at a time, by default the notes are
+                   split into about four chunks per worker
+
+    Returns:
+        list[str]: The HTML of each note, in the order given
+    """
+    texts = list(texts)
+    max_workers = min(max_workers or os.cpu_count() or 1, len(texts))
+    # Starting processes costs more than rendering a handful of notes
+    if max_workers <= 1:
+        return [_render_note(text) for text in texts]
+
+    if chunksize is None:
+        chunksize = max(1, len(texts) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_render_note, texts, chunksize=chunksize))
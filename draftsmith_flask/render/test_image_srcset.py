@@ -0,0 +1,44 @@
+from bs4 import BeautifulSoup
+from postprocess import add_image_srcset
+
+
+def test_add_image_srcset_asset_images():
+    html_input = '<p><img alt="photo" src="/m/PXL_20241026_233647996.jpg"></p>'
+
+    img = BeautifulSoup(
+        add_image_srcset(html_input, widths=(320, 640)), "html.parser"
+    ).img
+
+    assert img["src"] == "/m/PXL_20241026_233647996.jpg"
+    assert img["srcset"] == (
+        "/m/PXL_20241026_233647996.jpg?w=320 320w, "
+        "/m/PXL_20241026_233647996.jpg?w=640 640w"
+    )
+    assert img["sizes"]
+    assert img["loading"] == "lazy"
+
+
+def test_add_image_srcset_skips_other_images():
+    html_input = """
+    <img alt="" src="https://example.com/photo.jpg">
+    <img alt="" src="/m/diagram.svg">
+    <img alt="" src="/m/photo.jpg?w=320">
+    <img alt="" src="/m/photo.png" srcset="/m/photo.png 1x">
+    """
+
+    converted_html = add_image_srcset(html_input)
+
+    for img in BeautifulSoup(converted_html, "html.parser").find_all("img"):
+        assert not img.has_attr("sizes")
+
+
+def test_add_image_srcset_no_images():
+    html_input = "<p>No images here</p>"
+
+    assert add_image_srcset(html_input) == html_input
+
+
+def test_add_image_srcset_without_widths():
+    html_input = '<p><img alt="photo" src="/m/photo.jpg"></p>'
+
+    assert add_image_srcset(html_input, widths=()) == html_input
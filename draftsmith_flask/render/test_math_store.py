@@ -0,0 +1,54 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# math_store imports from the render package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from render.math_store import MathStore  # noqa: E402
+
+
+def test_restore_math_round_trip():
+    text = "Inline $a$ and $b$\n\n$$\nc = d\n$$\n"
+    store = MathStore()
+
+    preserved = store.preserve_math(text)
+
+    assert "$" not in preserved
+    assert store.restore_math(preserved) == text
+
+
+def test_restore_math_placeholder_prefixes():
+    # MATH_PLACEHOLDER_1 must not be restored inside MATH_PLACEHOLDER_10
+    text = " ".join(f"${i}$" for i in range(12))
+    store = MathStore()
+
+    assert store.restore_math(store.preserve_math(text)) == text
+
+
+def test_restore_math_adjacent_text():
+    text = "$x$1 and $y$_END"
+    store = MathStore()
+
+    assert store.restore_math(store.preserve_math(text)) == text
+
+
+def test_restore_math_benchmark_10k_inline_formulas():
+    text = "\n".join(f"Term {i} is $x_{{{i}}}^2$ here." for i in range(10_000))
+    store = MathStore()
+
+    start = time.perf_counter()
+    preserved = store.preserve_math(text)
+    # Stand in for the HTML produced by Markdown
+    html = f"<p>{preserved}</p>"
+    restored = store.restore_math(html)
+    elapsed = time.perf_counter() - start
+
+    assert len(store.math_blocks) == 10_000
+    assert restored == f"<p>{text}</p>"
+    print(f"Preserved and restored 10k inline formulas in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    pytest.main(["-s", __file__])
@@ -1,30 +1,48 @@
 #!/usr/bin/env python
-from datetime import datetime
 from api import (
+    Asset,
     TreeNote,
-    Note,
     UpdateNoteRequest,
     Tag,
     TreeTag,
     TreeTagWithNotes,
     NoteWithoutContent,
+    NotesPage,
+    NoteTagRelation,
 )
-from api import NoteAPI, TagAPI, TaskAPI, AssetAPI
+from api import NoteAPI, TagAPI, TaskAPI, AssetAPI, create_session
+from asset_cache import AssetCache, CachedAsset
+from cache import LRUCache, RequestCache, RequestMemo, TTLCache
 from flask import (
     Flask,
     Response,
+    g,
     render_template,
     request,
     redirect,
     url_for,
     flash,
+    send_file,
     send_from_directory,
     jsonify,
 )
 from flask_wtf.csrf import CSRFProtect
 from markupsafe import Markup
-from typing import List, Optional, Dict
+from render.postprocess import add_image_srcset
+from thumbnails import SRCSET_WIDTHS, make_thumbnail, thumbnail_width
+from tree_index import NoteTreeIndex
+from werkzeug.datastructures import Headers, IfRange
+from werkzeug.http import http_date, parse_date, unquote_etag
+from werkzeug.local import LocalProxy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Dict
+import contextvars
+import functools
+import mimetypes
 import os
+import re
+import tempfile
+import time
 import requests
 import sys
 
@@ -37,71 +55,165 @@ API_HOST = os.environ.get("API_HOST")
 API_PORT = os.environ.get("API_PORT")
 API_BASE_URL = f"{API_SCHEME}://{API_HOST}:{API_PORT}"
 
-# Initialize the API clients
-noteapi = NoteAPI(base_url=API_BASE_URL)
-tagapi = TagAPI(base_url=API_BASE_URL)
-taskapi = TaskAPI(base_url=API_BASE_URL)
-assetsapi = AssetAPI(base_url=API_BASE_URL)
+# Independent API calls made by a view are run concurrently on a shared pool
+# of threads, each of which may hold a connection to the API at once
+API_FANOUT_WORKERS = int(os.environ.get("API_FANOUT_WORKERS", "16"))
 
+# Connection pool and timeouts for the API, the pool should be at least as
+# large as the number of threads calling the API in each worker, so by default
+# it matches the fan-out pool
+API_POOL_SIZE = int(os.environ.get("API_POOL_SIZE", str(API_FANOUT_WORKERS)))
+API_CONNECT_TIMEOUT = float(os.environ.get("API_CONNECT_TIMEOUT", "3.05"))
+API_READ_TIMEOUT = float(os.environ.get("API_READ_TIMEOUT", "30"))
+
+# Initialize the API clients, sharing one keep-alive session between them
+api_session = create_session(
+    pool_size=API_POOL_SIZE, timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
+)
+# Reads of notes and tags are memoized for the duration of each request, so
+# views and context processors can share them without refetching
+noteapi = RequestMemo(NoteAPI(base_url=API_BASE_URL, session=api_session))
+tagapi = RequestMemo(TagAPI(base_url=API_BASE_URL, session=api_session))
+taskapi = TaskAPI(base_url=API_BASE_URL, session=api_session)
+assetsapi = AssetAPI(base_url=API_BASE_URL, session=api_session)
+
+
+# The notes and tags trees (and the index of note titles) only change when
+# they are mutated, so they are cached across requests. Mutating views
+# invalidate them, the TTL bounds how long changes made through other workers
+# or clients go unnoticed.
+TREE_CACHE_TTL = float(os.environ.get("TREE_CACHE_TTL", "30"))
+tree_cache = TTLCache(ttl=TREE_CACHE_TTL)
+
+
+def get_tree_index() -> NoteTreeIndex:
+    # The index is cached with the tree it was built from, so they are always
+    # consistent and it is rebuilt only when the tree is refetched
+    return tree_cache.get_or_set(
+        "notes_tree", lambda: NoteTreeIndex(noteapi.get_notes_tree())
+    )
+
+
+def get_notes_tree() -> List[TreeNote]:
+    return get_tree_index().roots
+
+
+def get_tags_tree() -> List[TreeTagWithNotes]:
+    return tree_cache.get_or_set("tags_tree", tagapi.get_tags_tree)
+
+
+def invalidate_trees() -> None:
+    tree_cache.invalidate()
 
-# BEGIN: API functions that should be implemented by server
-def get_recent_notes(limit: int = 10) -> List[Note]:
-    notes = noteapi.get_all_notes()
-    # Sort the notes by the last modified date, using a minimum datetime for None values
-    notes.sort(key=lambda x: x.modified_at or datetime.min, reverse=True)
-    return notes[:limit]
 
+def invalidates_trees(view):
+    """Invalidate the cached trees after a view handles a mutating request"""
 
-def get_full_titles(notes_tree: List[TreeNote]) -> Dict[int, str]:
-    def traverse_and_build_titles(
-        note: TreeNote, parent_title: str = ""
-    ) -> Dict[int, str]:
-        # Build the full title for the current note
-        full_title = f"{parent_title}/{note.title}".strip("/")
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            return view(*args, **kwargs)
+        finally:
+            if request.method not in ("GET", "HEAD"):
+                invalidate_trees()
 
-        # Prepare the result entry for the current note
-        result = {note.id: full_title}
+    return wrapper
 
-        # Recursively process children, updating the result dictionary
-        if note.children:
-            for child in note.children:
-                result.update(traverse_and_build_titles(child, full_title))
 
-        return result
+API_FANOUT_TIMEOUT = float(os.environ.get("API_FANOUT_TIMEOUT", "30"))
+fanout_executor = ThreadPoolExecutor(
+    max_workers=API_FANOUT_WORKERS, thread_name_prefix="api-fanout"
+)
 
-    # Perform traversal for each root note in the top-level list
-    all_full_titles = {}
-    for root_note in notes_tree:
-        all_full_titles.update(traverse_and_build_titles(root_note))
 
-    return all_full_titles
+def fan_out(
+    timeout: float | None = API_FANOUT_TIMEOUT, **calls: Callable[[], Any]
+) -> Dict[str, Any]:
+    """
+    Run independent API calls concurrently and return their results by name
 
+    Each call runs in a copy of the caller's context, so calls share the
+    request cache (and anything else on flask.g) with the view.
+
+    Args:
+        timeout: Seconds to wait for all of the calls, None to wait indefinitely
+        calls: The calls to make, keyed by the name of their result
 
-def find_note_path(
-    notes_tree: List[TreeNote],
-    target_id: int,
-    current_path: Optional[List[TreeNote]] = None,
-) -> Optional[List[TreeNote]]:
-    if current_path is None:
-        current_path = []
+    Returns:
+        Dict[str, Any]: The result of each call under its name
 
-    for note in notes_tree:
-        new_path = current_path + [note]
-        if note.id == target_id:
-            return new_path
-        if note.children:
-            result = find_note_path(note.children, target_id, new_path)
-            if result:
-                return result
-    return None
+    Raises:
+        TimeoutError: If the calls do not complete within the timeout
+        Exception: The first exception raised by any of the calls
+    """
+    futures = {
+        name: fanout_executor.submit(contextvars.copy_context().run, fn)
+        for name, fn in calls.items()
+    }
+    deadline = None if timeout is None else time.monotonic() + timeout
 
+    def remaining() -> float | None:
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
 
-def get_notes(ids: List[int] | None = None) -> List[Note]:
-    notes = noteapi.get_all_notes()
-    # Filter notes by ID if specified
-    if ids:
-        notes = [note for note in notes if note.id in ids]
-    return notes
+    try:
+        return {name: future.result(remaining()) for name, future in futures.items()}
+    finally:
+        for future in futures.values():
+            future.cancel()
+
+
+# BEGIN: API functions that should be implemented by server
+def get_recent_notes(limit: int = 10, cursor: Optional[str] = None) -> NotesPage:
+    return noteapi.get_recent_notes(limit=limit, cursor=cursor)
+
+
+def note_link_title(match: re.Match) -> str:
+    note = get_tree_index().nodes.get(int(match.group(1)))
+    return note.title if note is not None else ""
+
+
+# Markdown syntax removed when building plain text snippets
+SNIPPET_SUBSTITUTIONS = [
+    (re.compile(r"!\[\[[^\]]*\]\]"), ""),  # Transclusions
+    (re.compile(r"\[\[\d+\|([^\]]+)\]\]"), r"\1"),  # Labelled wikilinks
+    (re.compile(r"\[\[(\d+)\]\]"), note_link_title),  # Wikilinks
+    (re.compile(r"!\[([^\]]*)\]\([^)]*\)"), r"\1"),  # Images
+    (re.compile(r"\[([^\]]*)\]\([^)]*\)"), r"\1"),  # Links
+    (re.compile(r"<[^>]+>"), ""),  # HTML tags
+    (re.compile(r"^\s{0,3}(#{1,6}|>|[-*+]|\d+\.)\s+", re.MULTILINE), ""),  # Blocks
+    (re.compile(r"^\s*(```|~~~).*$", re.MULTILINE), ""),  # Code fences
+    # Inline markup, underscores only at word boundaries as in snake_case
+    (re.compile(r"[`*~]+|(?<!\w)_+|_+(?!\w)"), ""),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def make_snippet(content: str, length: int = 200) -> str:
+    """Build a plain text snippet of a note from its markdown content"""
+    text = content
+    for pattern, replacement in SNIPPET_SUBSTITUTIONS:
+        text = pattern.sub(replacement, text)
+    text = text.strip()
+    if len(text) > length:
+        # Cut on a word boundary where possible
+        text = text[:length].rsplit(" ", 1)[0]
+    return text
+
+
+def get_note_index() -> Dict[int, NoteWithoutContent]:
+    # Only titles and timestamps are needed, so avoid fetching every note body
+    return tree_cache.get_or_set(
+        "note_index",
+        lambda: {n.id: n for n in noteapi.get_all_notes_without_content()},
+    )
+
+
+def get_notes(ids: List[int] | None = None) -> List[NoteWithoutContent]:
+    index = get_note_index()
+    # Filter notes by ID if specified, an empty list selects no notes
+    if ids is not None:
+        return [index[id] for id in ids if id in index]
+    return list(index.values())
 
 
 # END: API functions that should be implemented by server
@@ -209,10 +321,7 @@ def build_tags_tree_html(
     return "\n".join(html)
 
 
-def build_notes_tree_html(
-    notes_tree: List[TreeNote], fold_level: int = 2, note_id: int | None = None
-) -> str:
-    file_svg = """<svg
+note_file_svg = """<svg
         xmlns="http://www.w3.org/2000/svg"
         fill="none"
         viewBox="0 0 24 24"
@@ -225,84 +334,108 @@ def build_notes_tree_html(
           d="M19.5 14.25v-2.625a3.375 3.375 0 00-3.375-3.375h-1.5A1.125 1.125 0 0113.5 7.125v-1.5a3.375 3.375 0 00-3.375-3.375H8.25m0 12.75h7.5m-7.5 3H12M10.5 2.25H5.625c-.621 0-1.125.504-1.125 1.125v17.25c0 .621.504 1.125 1.125 1.125h12.75c.621 0 1.125-.504 1.125-1.125V11.25a9 9 0 00-9-9z" />
       </svg>"""
 
-    def find_parent_ids(
-        tree: List[TreeNote], target_id: int, path: set[int] = None
-    ) -> set[int]:
-        if path is None:
-            path = set()
+HIGHLIGHT_CLASSES = " bg-blue-100 text-blue-800 font-semibold rounded-md"
 
-        for note in tree:
-            if note.id == target_id:
-                return path
-            if note.children:
-                child_path = find_parent_ids(note.children, target_id, path | {note.id})
-                if child_path is not None:
-                    return child_path
-        return None
 
-    parent_ids = (
-        set() if note_id is None else (find_parent_ids(notes_tree, note_id) or set())
-    )
-
-    def render_note(
-        note: TreeNote, depth: int = 0, parent_of_current: bool = False
-    ) -> str:
-        svg = file_svg if not note.children else folder_svg
-
-        # Determine if this note should be open
-        should_open = (
-            note.id in parent_ids  # Open if it's a parent of current note
-            or note.id == note_id  # Open if it's the current note
-            or (
-                parent_of_current and depth < fold_level
-            )  # Open if under current note within fold_level
-        )
-
-        status = "open" if should_open else "closed"
-
-        # Initialize classes list for all notes
-        classes = ["note-item"]
-
-        # Add highlighting classes if this is the current note
-        if note.id == note_id:
-            classes.extend(
-                ["bg-blue-100", "text-blue-800", "font-semibold", "rounded-md"]
-            )
+class NotesTreeTemplate:
+    """
+    The sidebar markup of a notes tree with every note closed and unhighlighted.
 
-        class_str = " ".join(classes)
-        hyperlink = f'{svg}<a href="/note/{note.id}">{note.title}</a>'
+    The offsets of each note's class attribute and `<details closed>` status
+    are recorded, so the markup for a given current note can be produced by
+    editing only the notes on its path instead of rendering the whole tree.
+    """
 
-        if note.children:
-            # Sort the children before rendering them
-            note.children.sort(key=lambda x: x.title)
+    def __init__(self, notes_tree: List[TreeNote]):
+        parts = ['<ul class="menu bg-base-200 rounded-box w-full md:w-56">']
+        position = len(parts[0])
+        # Offsets just after "note-item" and at "closed", by note id
+        self.class_offsets: Dict[int, List[int]] = {}
+        self.status_offsets: Dict[int, List[int]] = {}
+
+        def emit(text: str) -> None:
+            nonlocal position
+            parts.append(text)
+            position += len(text)
+
+        def render_note(note: TreeNote) -> None:
+            svg = note_file_svg if not note.children else folder_svg
+            hyperlink = f'{svg}<a href="/note/{note.id}">{note.title}</a>'
+
+            emit('<li class="note-item')
+            self.class_offsets.setdefault(note.id, []).append(position)
+            emit(f'" draggable="true" data-note-id="{note.id}">')
+            if note.children:
+                emit("<details ")
+                self.status_offsets.setdefault(note.id, []).append(position)
+                emit(f"closed><summary>{hyperlink}</summary>\n<ul>")
+                # Sort a copy, the tree may be shared with other requests
+                for child in sorted(note.children, key=lambda x: x.title):
+                    render_note(child)
+                emit("</ul>\n</details>\n</li>")
+            else:
+                emit(f"{hyperlink}</li>")
+
+        # Sort the top-level notes
+        for note in sorted(notes_tree, key=lambda x: x.title):
+            render_note(note)
+        emit("</ul>")
+        self.html = "".join(parts)
+
+    def render(self, open_ids: Iterable[int], highlight_id: int | None) -> str:
+        edits = [
+            (offset, len("closed"), "open")
+            for id in open_ids
+            for offset in self.status_offsets.get(id, [])
+        ]
+        edits.extend(
+            (offset, 0, HIGHLIGHT_CLASSES)
+            for offset in self.class_offsets.get(highlight_id, [])
+        )
+        edits.sort()
 
-            # Determine if children are under the current note
-            is_current = note.id == note_id
+        parts = []
+        last = 0
+        for offset, length, text in edits:
+            parts.append(self.html[last:offset])
+            parts.append(text)
+            last = offset + length
+        parts.append(self.html[last:])
+        return "".join(parts)
 
-            html = f'<li class="{class_str}" draggable="true" data-note-id="{note.id}"><details {status}><summary>{hyperlink}</summary>\n<ul>'
 
-            for child in note.children:
-                html += render_note(child, depth + 1, is_current)
-            html += "</ul>\n</details>\n</li>"
-        else:
-            html = f'<li class="{class_str}" draggable="true" data-note-id="{note.id}">{hyperlink}</li>'
+@functools.lru_cache(maxsize=1)
+def get_notes_tree_template(index: NoteTreeIndex) -> NotesTreeTemplate:
+    # Keyed by the index, which is replaced whenever the tree is refetched
+    return NotesTreeTemplate(index.roots)
 
-        return html
 
-    # Sort the top-level notes
-    notes_tree.sort(key=lambda x: x.title)
+def build_notes_tree_html(
+    notes_tree: List[TreeNote], fold_level: int = 2, note_id: int | None = None
+) -> str:
+    index = get_tree_index()
+    if index.roots is notes_tree:
+        template = get_notes_tree_template(index)
+    else:
+        index = NoteTreeIndex(notes_tree)
+        template = NotesTreeTemplate(notes_tree)
+    if note_id is None or note_id not in index.nodes:
+        return template.html
 
-    html = '<ul class="menu bg-base-200 rounded-box w-full md:w-56">'
-    for note in notes_tree:
-        html += render_note(note, 0)
-    html += "</ul>"
+    # Open the current note and its ancestors
+    ancestor_ids = index.ancestor_ids(note_id)
+    open_ids = [note_id, *ancestor_ids]
+    # and its children, if they are within fold_level of the root
+    if len(ancestor_ids) + 1 < fold_level:
+        open_ids.extend(child.id for child in index.nodes[note_id].children)
 
-    return html
+    return template.render(open_ids, highlight_id=note_id)
 
 
 @app.context_processor
 def inject_all_notes():
-    return dict(all_notes=get_notes())
+    # Resolved lazily so the notes are only loaded if a template uses them
+    return dict(all_notes=LocalProxy(get_notes))
 
 
 @app.route("/manifest.json")
@@ -319,6 +452,28 @@ def add_cache_control_header(response):
 app.after_request(add_cache_control_header)
 
 
+def create_request_cache():
+    # Created before the view runs, rather than on first use, so calls fanned
+    # out to other threads cannot each create their own
+    g.request_cache = RequestCache()
+
+
+app.before_request(create_request_cache)
+
+
+def add_request_cache_header(response):
+    # Report how many API reads were served from the request cache
+    cache = g.get("request_cache")
+    if cache is not None and (cache.hits or cache.misses):
+        response.headers["X-Request-Cache"] = (
+            f"hits={cache.hits}; misses={cache.misses}"
+        )
+    return response
+
+
+app.after_request(add_request_cache_header)
+
+
 @app.route("/")
 def root():
     # return redirect(url_for("note_detail", note_id=1))
@@ -328,7 +483,7 @@ def root():
 
 @app.context_processor
 def inject_tag_sidebar():
-    tags_tree = tagapi.get_tags_tree()
+    tags_tree = get_tags_tree()
     tag_html = Markup(build_tags_tree_html(tags_tree))
     return dict(tag_html=tag_html)
 
@@ -340,27 +495,58 @@ def tag_detail(tag_id: int):
     return render_template("tagged_pages_list.html", notes=notes, tag=tag)
 
 
+# Rendered notes are keyed by their modified_at, so edits are picked up at
+# once. Transcluded notes and link titles can change without it, the TTL
+# bounds how long those changes go unnoticed.
+RENDER_CACHE_MAX_BYTES = int(
+    os.environ.get("RENDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+RENDER_CACHE_TTL = float(os.environ.get("RENDER_CACHE_TTL", "300"))
+render_cache = LRUCache(
+    max_size=RENDER_CACHE_MAX_BYTES,
+    sizeof=lambda html: len(html.encode()),
+    ttl=RENDER_CACHE_TTL,
+)
+
+
+def get_rendered_html(note_id: int) -> str:
+    def render() -> str:
+        html = noteapi.get_rendered_note(note_id, format="html")
+        # Serve resized variants of embedded photos to smaller screens
+        return add_image_srcset(html, widths=SRCSET_WIDTHS)
+
+    # The note is memoized for the request, so views that also show it don't
+    # fetch it twice
+    note = noteapi.get_note(note_id)
+    return render_cache.get_or_set((note_id, note.modified_at, "html"), render)
+
+
 @app.route("/note/<int:note_id>")
 def note_detail(note_id):
-    note = noteapi.get_note(note_id)
-    notes_tree = noteapi.get_notes_tree()
+    # None of these depend on each other, so fetch them concurrently
+    results = fan_out(
+        note=lambda: noteapi.get_note(note_id),
+        notes_tree=get_notes_tree,
+        # Get backlinks for the current note
+        backlinks=lambda: noteapi.get_note_backlinks(note_id),
+        forwardlinks=lambda: noteapi.get_note_forward_links(note_id),
+        # Get tags (TODO this needs an endpoint)
+        tags=lambda: get_note_tags(note_id),
+        # Parse the markdown content
+        html_content=lambda: get_rendered_html(note_id),
+    )
+    note = results["note"]
+    notes_tree = results["notes_tree"]
+    backlinks = results["backlinks"]
+    forwardlinks = results["forwardlinks"]
+    tags = results["tags"]
+    html_content = results["html_content"]
+
     tree_html = build_notes_tree_html(notes_tree, note_id=note_id)
     tree_html = Markup(tree_html)
 
     # Find the path to the current note
-    note_path = find_note_path(notes_tree, note_id)
-
-    # Get backlinks for the current note
-    backlinks = noteapi.get_note_backlinks(note_id)
-    forwardlinks = noteapi.get_note_forward_links(note_id)
-
-    # Get tags (TODO this needs an endpoint)
-
-    note_tags = tagapi.get_note_tag_relations()
-    tags = [tagapi.get_tag(nt.tag_id) for nt in note_tags if nt.note_id == note_id]
-
-    # Parse the markdown content
-    html_content = noteapi.get_rendered_note(note_id, format="html")
+    note_path = get_tree_index().path(note_id)
 
     return render_template(
         "note_detail.html",
@@ -374,19 +560,33 @@ def note_detail(note_id):
     )
 
 
-def get_note_tags(note_id) -> List[Tag]:
-    note_tags = tagapi.get_note_tag_relations()
-    tags = [tagapi.get_tag(nt.tag_id) for nt in note_tags if nt.note_id == note_id]
+def get_tags_by_id() -> Dict[int, Tag]:
+    return tree_cache.get_or_set(
+        "tags_by_id", lambda: {tag.id: tag for tag in tagapi.get_all_tags()}
+    )
+
+
+def get_note_tag_relations() -> List[NoteTagRelation]:
+    return tree_cache.get_or_set("note_tag_relations", tagapi.get_note_tag_relations)
+
+
+def get_tags_for_notes(note_ids: List[int]) -> Dict[int, List[Tag]]:
+    """Resolve the tags of many notes at once, rather than one request per tag"""
+    tags_by_id = get_tags_by_id()
+    tags: Dict[int, List[Tag]] = {note_id: [] for note_id in note_ids}
+    for nt in get_note_tag_relations():
+        if nt.note_id in tags and nt.tag_id in tags_by_id:
+            tags[nt.note_id].append(tags_by_id[nt.tag_id])
     return tags
 
 
+def get_note_tags(note_id) -> List[Tag]:
+    return get_tags_for_notes([note_id])[note_id]
+
+
 def get_tag_notes(tag_id) -> List[NoteWithoutContent]:
-    note_tags = tagapi.get_note_tag_relations()
-    relevant_note_tags = [nt for nt in note_tags if nt.tag_id == tag_id]
-    all_note_details = [
-        noteapi.get_note_without_content(nt.note_id) for nt in relevant_note_tags
-    ]
-    return all_note_details
+    note_ids = [nt.note_id for nt in get_note_tag_relations() if nt.tag_id == tag_id]
+    return get_notes(note_ids)
 
 
 @app.context_processor
@@ -402,14 +602,20 @@ def inject_backlinks():
 
 @app.route("/edit/<int:note_id>")
 def edit_note(note_id):
-    note = noteapi.get_note(note_id)
-    notes_tree = noteapi.get_notes_tree()
+    results = fan_out(
+        note=lambda: noteapi.get_note(note_id),
+        notes_tree=get_notes_tree,
+        html_content=lambda: get_rendered_html(note_id),
+    )
+    note = results["note"]
+    notes_tree = results["notes_tree"]
+    html_content = results["html_content"]
+
     tree_html = build_notes_tree_html(notes_tree, note_id=note_id)
     tree_html = Markup(tree_html)
 
     # Find the path to the current note
-    note_path = find_note_path(notes_tree, note_id)
-    html_content = noteapi.get_rendered_note(note_id, format="html")
+    note_path = get_tree_index().path(note_id)
 
     return render_template(
         "note_edit.html",
@@ -422,10 +628,11 @@ def edit_note(note_id):
 
 @app.route("/notes/create", methods=["GET", "POST"])
 @app.route("/notes/create/<int:parent_id>", methods=["GET", "POST"])
+@invalidates_trees
 def create_note_page(parent_id=None):
     if request.method == "GET":
         print(f"DEBUG: Received GET request with parent_id: {parent_id}")  # Debug log
-        notes_tree = noteapi.get_notes_tree()
+        notes_tree = get_notes_tree()
         tree_html = build_notes_tree_html(notes_tree, note_id=parent_id)
         tree_html = Markup(tree_html)
 
@@ -472,6 +679,7 @@ def create_note_page(parent_id=None):
 
 # TODO Implement title
 @app.route("/edit/<int:note_id>", methods=["POST", "PUT"])
+@invalidates_trees
 def update_note(note_id):
     title = request.form.get("title")
     content = request.form.get("content")
@@ -486,6 +694,8 @@ def update_note(note_id):
             note_id, UpdateNoteRequest(title=title, content=content)
         )
         # Refresh the page to show the updated note
+    # Other notes may transclude or link to this one, so drop every note
+    render_cache.invalidate()
     return redirect(url_for("note_detail", note_id=note_id))
 
 
@@ -498,26 +708,24 @@ def search():
     # TODO maybe API should include a field with and withot the full name to
     # Save multiple requests?
     search_results = noteapi.search_notes(query)
-    notes_tree = noteapi.get_notes_tree()
+    notes_tree = get_notes_tree()
     tree_html = build_notes_tree_html(notes_tree, note_id=None)
     tree_html = Markup(tree_html)
 
-    ids = [n.id for n in search_results]
-    full_titles = get_full_titles(notes_tree)
+    full_titles = get_tree_index().full_titles
 
-    # TODO this should return the tree and construct the nested title
-    # Maybe regail this to the server?
-    search_results = []
-    for note_id in ids:
-        note = noteapi.get_note(note_id)
-        html_content = noteapi.get_rendered_note(note.id, format="html")
-        search_result = {
+    # The search already returns each note's content, so build the results
+    # from it and resolve the tags of every result in one pass
+    note_tags = get_tags_for_notes([note.id for note in search_results])
+    search_results = [
+        {
             "id": note.id,
-            "title": full_titles[note.id],
-            "content": f"<div>{html_content[:200]}</div> ...",
-            "tags": get_note_tags(note.id),
+            "title": full_titles.get(note.id, note.title),
+            "content": Markup("<div>{}</div> ...").format(make_snippet(note.content)),
+            "tags": note_tags[note.id],
         }
-        search_results.append(search_result)
+        for note in search_results
+    ]
 
     return render_template(
         "note_search.html",
@@ -529,9 +737,12 @@ def search():
 
 
 @app.route("/note/<int:note_id>/delete", methods=["POST"])
+@invalidates_trees
 def delete_note_page(note_id):
     try:
         noteapi.delete_note(note_id)
+        # Links to the note in other rendered notes are now broken
+        render_cache.invalidate()
         flash("Note deleted successfully", "success")
         return redirect(url_for("root"))
     except requests.exceptions.HTTPError as e:
@@ -546,6 +757,7 @@ def delete_note_page(note_id):
 
 
 @app.route("/note/<int:note_id>/detach", methods=["POST"])
+@invalidates_trees
 def detach_note(note_id):
     try:
         noteapi.detach_note_from_parent(note_id)
@@ -559,6 +771,7 @@ def detach_note(note_id):
 
 
 @app.route("/note/<int:note_id>/move", methods=["GET", "POST"])
+@invalidates_trees
 def move_note(note_id):
     if request.method == "GET":
         return render_template("move_note.html", note_id=note_id)
@@ -600,24 +813,16 @@ def upload_asset():
 
         if file:
             if filename := file.filename:
-                file_path = os.path.join("temp", filename)
-                os.makedirs("temp", exist_ok=True)  # Ensure the temp directory exists
-                file.save(file_path)
-
                 try:
-                    # If custom filename provided, use that as the upload path instead
-                    upload_path = os.path.join(
-                        "temp", custom_filename if custom_filename else filename
-                    )
-                    if custom_filename:
-                        os.rename(file_path, upload_path)
-                        file_to_cleanup = upload_path
-                    else:
-                        file_to_cleanup = file_path
-
+                    # Stream the upload straight through to the API, under
+                    # the custom filename if one was provided
                     result = assetsapi.upload_asset(
-                        upload_path if custom_filename else file_path
+                        file.stream,
+                        filename=os.path.basename(custom_filename or filename),
+                        content_type=file.mimetype or None,
                     )
+                    # A new upload may replace an asset of the same name
+                    evict_cached_asset(result)
                     flash(
                         f"File uploaded successfully. asset_id: {result.id}, server_filename: {result.location}\n",
                         "success",
@@ -626,34 +831,87 @@ def upload_asset():
                     # NOTE Don't return to original page, this is simpler
                 except Exception as e:
                     flash(f"Error uploading file: {str(e)}", "error")
-                finally:
-                    # Clean up the temporary file - either the renamed one or original
-                    if os.path.exists(file_to_cleanup):
-                        os.remove(file_to_cleanup)
             else:
                 flash("Please provide a file. Unable to get a filename", "error")
         else:
             flash("Please provide a file.", "error")
 
-    notes_tree = noteapi.get_notes_tree()
+    notes_tree = get_notes_tree()
     tree_html = build_notes_tree_html(notes_tree)
     tree_html = Markup(tree_html)
     return render_template("upload_asset.html", tree_html=tree_html)
 
 
+# Uploads of a bulk request in flight at once, within API_POOL_SIZE
+ASSET_UPLOAD_WORKERS = int(os.environ.get("ASSET_UPLOAD_WORKERS", "4"))
+
+
+@app.route("/upload_assets", methods=["POST"])
+def upload_assets():
+    files = [f for f in request.files.getlist("files") if f.filename]
+    if not files:
+        return jsonify({"error": "Please provide at least one file"}), 400
+
+    results = assetsapi.upload_assets(
+        [(os.path.basename(f.filename), f.stream, f.mimetype or None) for f in files],
+        max_workers=ASSET_UPLOAD_WORKERS,
+    )
+    for r in results:
+        if r.asset:
+            evict_cached_asset(r.asset)
+    links = [r.asset.get_markdown_link() for r in results if r.asset]
+    body = {
+        "results": [
+            {
+                **r.model_dump(mode="json"),
+                "markdown_link": r.asset.get_markdown_link() if r.asset else None,
+            }
+            for r in results
+        ],
+        "markdown": "\n".join(links),
+    }
+    # Report partial success per file, only fail if nothing was uploaded
+    return jsonify(body), 200 if links else 502
+
+
+ASSET_MIME_TYPES = ["image", "video", "audio", "text", "application/pdf"]
+
+
 @app.route("/assets")
 def list_assets():
-    assets = assetsapi.get_all_assets()
-    notes_tree = noteapi.get_notes_tree()
+    filters = {
+        "note_id": request.args.get("note_id", type=int),
+        "mime_type": request.args.get("mime_type") or None,
+        "order": "asc" if request.args.get("order") == "asc" else "desc",
+    }
+    cursor = request.args.get("cursor")
+    try:
+        page = assetsapi.get_assets(limit=50, cursor=cursor, **filters)
+    except ValueError:
+        flash("Invalid cursor, showing the first page", "error")
+        page = assetsapi.get_assets(limit=50, **filters)
+    notes_tree = get_notes_tree()
     tree_html = build_notes_tree_html(notes_tree)
     tree_html = Markup(tree_html)
-    return render_template("asset_list.html", assets=assets, tree_html=tree_html)
+    return render_template(
+        "asset_list.html",
+        assets=page.assets,
+        next_cursor=page.next_cursor,
+        filters=filters,
+        mime_types=ASSET_MIME_TYPES,
+        tree_html=tree_html,
+    )
 
 
 @app.route("/delete_asset/<int:asset_id>")
 def delete_asset(asset_id: int):
     try:
         assetsapi.delete_asset(asset_id)
+        # The asset list passes the name the asset is served by, otherwise its
+        # entry is evicted once revalidation finds the asset is gone
+        asset_cache.evict(str(asset_id))
+        if location := request.args.get("location"):
+            asset_cache.evict(location)
         flash("Asset deleted successfully", "success")
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 404:
@@ -674,38 +932,303 @@ def edit_asset(asset_id):
     return redirect(url_for("list_assets"))
 
 
+# Headers that only apply to a single connection, a proxy must not forward them
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+}
+ASSET_CHUNK_SIZE = 64 * 1024
+
+# Uploaded assets rarely change, so they are cached on local disk
+ASSET_CACHE_DIR = os.environ.get(
+    "ASSET_CACHE_DIR", os.path.join(tempfile.gettempdir(), "draftsmith_asset_cache")
+)
+ASSET_CACHE_MAX_BYTES = int(os.environ.get("ASSET_CACHE_MAX_BYTES", str(1024**3)))
+ASSET_CACHE_REVALIDATE = float(os.environ.get("ASSET_CACHE_REVALIDATE", "3600"))
+asset_cache = AssetCache(
+    ASSET_CACHE_DIR,
+    max_bytes=ASSET_CACHE_MAX_BYTES,
+    revalidate_after=ASSET_CACHE_REVALIDATE,
+)
+# Revalidation responses that mean the cached copy is out of date, after any
+# other response (e.g. the API failing) the cached copy is kept
+ASSET_REPLACED_STATUSES = (200, 404, 410)
+
+
+def evict_cached_asset(asset: Asset) -> None:
+    """Remove an asset from the local cache, under each name it is served by"""
+    asset_cache.evict(asset.get_stripped_location())
+    asset_cache.evict(str(asset.id))
+
+
+def forwardable_headers(headers) -> Headers:
+    return Headers(
+        [(k, v) for k, v in headers.items() if k.lower() not in HOP_BY_HOP_HEADERS]
+    )
+
+
 @app.route("/m/<string:maybe_id>", methods=["GET"])
 def get_asset(maybe_id):
     """
-    Retrieve an asset by filename and redirect to its download URL.
+    Retrieve an asset by filename and stream it from the API.
+
+    The body is streamed through in chunks as it arrives, so memory use is
+    bounded regardless of the size of the asset. Complete downloads are kept
+    in the local asset cache and served from disk until they are due for
+    revalidation with the API.
+
+    Images can be requested at a smaller width with `?w=<pixels>`, see
+    send_thumbnail.
 
     Args:
         maybe_id (str): The asset ID or filename.
 
     Returns:
-        Response: A redirection to the asset's download URL or a 404 error if not found.
+        Response: The streamed asset, the API's error response, or a 502 error
+                  if the API could not be reached. A cached copy that is due
+                  for revalidation is still served if the API fails.
     """
-    # Construct the API URL
-    api_url = f"{API_BASE_URL}/assets/download/{maybe_id}"
-
-    # Convert Flask request headers to a dictionary
-    headers = dict(request.headers)
+    width = request.args.get("w", type=int)
+    if width is not None:
+        response = send_thumbnail(maybe_id, width)
+        if response is not None:
+            return response
+
+    entry = asset_cache.lookup(maybe_id)
+    if entry is not None and asset_cache.is_fresh(entry):
+        return send_cached_asset(entry)
+
+    # Forward the client's headers, except those specific to this connection
+    headers = forwardable_headers(request.headers)
+    headers.remove("Host")
+    if entry is not None:
+        # Revalidate the whole cached copy, the client's conditions and range
+        # are then applied to it locally
+        for name in ("If-None-Match", "If-Modified-Since", "Range", "If-Range"):
+            headers.remove(name)
+        headers.update(revalidation_headers(entry))
 
-    # Forward the GET request to the API URL
     try:
-        # Use the transformed headers dictionary
-        response = requests.get(api_url, headers=headers, timeout=5)
-
-        # Create a new response with the data from the API
-        forwarded_response = Response(
-            response.content, response.status_code, dict(response.headers.items())
-        )
-        return forwarded_response
-
+        upstream = assetsapi.open_asset(maybe_id, headers=dict(headers))
     except requests.exceptions.RequestException as e:
+        if entry is not None:
+            # Serve the stale copy rather than nothing while the API is down
+            return send_cached_asset(entry)
         # If there's an issue with connecting to the API, return a 502 Bad Gateway error
         return Response(str(e), status=502)
 
+    if entry is not None:
+        if upstream.status_code == 304:
+            upstream.close()
+            asset_cache.refresh(entry)
+            return send_cached_asset(entry)
+        if upstream.status_code >= 500:
+            upstream.close()
+            return send_cached_asset(entry)
+        if upstream.status_code in ASSET_REPLACED_STATUSES:
+            # The asset has changed or is gone, the response below replaces it
+            asset_cache.evict(maybe_id)
+
+    # This server sets its own Server and Date headers
+    response_headers = forwardable_headers(upstream.headers)
+    response_headers.remove("Server")
+    response_headers.remove("Date")
+
+    # Pass the raw (still encoded) bytes through, so Content-Length and
+    # Content-Encoding from the API remain valid
+    body = upstream.raw.stream(ASSET_CHUNK_SIZE, decode_content=False)
+    status = upstream.status_code
+
+    # The Range header is forwarded, so an API that supports ranges answers
+    # with 206 itself. If it ignored the range, serve the range from the full
+    # body so seeking in media still works (at the cost of reading the skipped
+    # bytes from the API).
+    length = upstream.headers.get("Content-Length")
+    if status == 200 and length and "Content-Encoding" not in upstream.headers:
+        length = int(length)
+        response_headers.setdefault("Accept-Ranges", "bytes")
+        byte_range = request.range
+        if (
+            byte_range is not None
+            and len(byte_range.ranges) == 1
+            and if_range_matches(request.if_range, upstream.headers)
+        ):
+            start_stop = byte_range.range_for_length(length)
+            if start_stop is None:
+                upstream.close()
+                return Response(
+                    status=416, headers={"Content-Range": f"bytes */{length}"}
+                )
+            start, stop = start_stop
+            body = slice_chunks(body, start, stop)
+            status = 206
+            response_headers["Content-Range"] = byte_range.to_content_range_header(
+                length
+            )
+            response_headers["Content-Length"] = str(stop - start)
+
+        # Keep a copy of complete downloads so later requests skip the API
+        if (
+            status == 200
+            and byte_range is None
+            and length <= asset_cache.max_entry_bytes
+        ):
+            body = asset_cache.tee(
+                maybe_id,
+                body,
+                content_type=upstream.headers.get("Content-Type"),
+                etag=upstream.headers.get("ETag"),
+                last_modified=parse_date(upstream.headers.get("Last-Modified")),
+            )
+
+    response = Response(
+        body,
+        status=status,
+        headers=response_headers,
+        direct_passthrough=True,
+    )
+    response.call_on_close(upstream.close)
+    return response
+
+
+def revalidation_headers(entry: CachedAsset) -> Dict[str, str]:
+    """Conditional request headers to check a cached asset is still current"""
+    if entry.etag:
+        return {"If-None-Match": entry.etag}
+    if entry.last_modified:
+        return {"If-Modified-Since": http_date(entry.last_modified)}
+    return {}
+
+
+def fetch_cached_asset(name: str) -> Optional[CachedAsset]:
+    """
+    Get an asset from the local cache, downloading or revalidating it first.
+
+    Returns:
+        The cache entry, or None if the asset could not be cached, e.g. it is
+        too large or the API returned an error. A stale entry is returned if
+        it could not be revalidated.
+    """
+    entry = asset_cache.lookup(name)
+    if entry is not None and asset_cache.is_fresh(entry):
+        return entry
+
+    headers = revalidation_headers(entry) if entry is not None else {}
+    try:
+        upstream = assetsapi.open_asset(name, headers=headers)
+    except requests.exceptions.RequestException:
+        return entry
+
+    with upstream:
+        if entry is not None:
+            if upstream.status_code == 304:
+                asset_cache.refresh(entry)
+                return entry
+            if upstream.status_code not in ASSET_REPLACED_STATUSES:
+                return entry
+            asset_cache.evict(name)
+        length = upstream.headers.get("Content-Length")
+        if upstream.status_code != 200 or (
+            length and int(length) > asset_cache.max_entry_bytes
+        ):
+            return None
+        # tee only stores the asset once it has been read to the end
+        for _ in asset_cache.tee(
+            name,
+            upstream.iter_content(ASSET_CHUNK_SIZE),
+            content_type=upstream.headers.get("Content-Type"),
+            etag=upstream.headers.get("ETag"),
+            last_modified=parse_date(upstream.headers.get("Last-Modified")),
+        ):
+            pass
+    return asset_cache.lookup(name)
+
+
+def send_thumbnail(name: str, requested_width: int) -> Optional[Response]:
+    """
+    Serve an image asset resized to one of THUMBNAIL_WIDTHS.
+
+    The original is fetched into the asset cache and resized on the first
+    request, the resized variant is then cached alongside it. Variants are
+    keyed by the digest of the original, so they are replaced whenever the
+    original changes.
+
+    Returns:
+        The response, or None if the asset is not an image that can be
+        resized and the original should be served instead.
+    """
+    width = thumbnail_width(requested_width)
+    content_type = mimetypes.guess_type(name)[0] or ""
+    if width is None or not content_type.startswith("image/"):
+        return None
+
+    source = fetch_cached_asset(name)
+    if source is None:
+        return None
+
+    variant_name = f"{source.digest}?w={width}"
+    variant = asset_cache.lookup(variant_name)
+    if variant is None:
+        thumbnail = make_thumbnail(asset_cache.object_path(source), width)
+        if thumbnail is None:
+            # Already small enough, or not a format that is resized
+            return send_cached_asset(source)
+        data, content_type = thumbnail
+        for _ in asset_cache.tee(variant_name, [data], content_type=content_type):
+            pass
+        variant = asset_cache.lookup(variant_name)
+        if variant is None:
+            return send_cached_asset(source)
+    return send_cached_asset(variant)
+
+
+def send_cached_asset(entry: CachedAsset) -> Response:
+    # send_file answers conditional and range requests from the cached file
+    return send_file(
+        asset_cache.object_path(entry),
+        mimetype=entry.content_type
+        or mimetypes.guess_type(entry.name)[0]
+        or "application/octet-stream",
+        etag=entry.digest,
+        last_modified=entry.last_modified,
+        conditional=True,
+    )
+
+
+def if_range_matches(if_range: IfRange, headers) -> bool:
+    """
+    Check an If-Range condition against the validators of a response.
+
+    A range may only be served if the representation still matches, per
+    RFC 9110 this needs a strong ETag or an exactly matching Last-Modified.
+    """
+    if if_range.etag is not None:
+        etag, weak = unquote_etag(headers.get("ETag"))
+        return etag is not None and not weak and etag == if_range.etag
+    if if_range.date is not None:
+        return parse_date(headers.get("Last-Modified")) == if_range.date
+    # No If-Range header
+    return True
+
+
+def slice_chunks(chunks: Iterable[bytes], start: int, stop: int) -> Iterator[bytes]:
+    """Yield only the bytes in [start, stop) of a stream of chunks"""
+    position = 0
+    for chunk in chunks:
+        end = position + len(chunk)
+        if end > start:
+            yield chunk[max(0, start - position) : stop - position]
+        position = end
+        if position >= stop:
+            break
+
 
 # NOTE The following will not work:
 # return redirect(f"{API_BASE_URL}/assets/download/{maybe_id}")
@@ -713,6 +1236,7 @@ def get_asset(maybe_id):
 
 
 @app.route("/manage_tags/<int:note_id>", methods=["GET", "POST"])
+@invalidates_trees
 def manage_tags(note_id):
     note = noteapi.get_note(note_id)
     if request.method == "POST":
@@ -720,9 +1244,11 @@ def manage_tags(note_id):
         selected_tag_ids = request.form.getlist("tags")
         selected_tag_ids = [int(tag_id) for tag_id in selected_tag_ids]
 
-        # Get current tags to determine which to add/remove
-        current_tags = get_note_tags(note_id)
-        current_tag_ids = [tag.id for tag in current_tags]
+        # Get current tags to determine which to add/remove, bypassing the
+        # cache as another worker may have changed them since it was filled
+        current_tag_ids = [
+            nt.tag_id for nt in tagapi.get_note_tag_relations() if nt.note_id == note_id
+        ]
 
         # Determine which tags to add and remove
         tags_to_add = [
@@ -747,7 +1273,7 @@ def manage_tags(note_id):
 
         return redirect(url_for("note_detail", note_id=note_id))
 
-    notes_tree = noteapi.get_notes_tree()
+    notes_tree = get_notes_tree()
     tree_html = build_notes_tree_html(notes_tree, note_id=note_id)
     tree_html = Markup(tree_html)
 
@@ -768,7 +1294,7 @@ def manage_tags(note_id):
 
 @app.route("/manage_all_tags")
 def manage_all_tags():
-    notes_tree = noteapi.get_notes_tree()
+    notes_tree = get_notes_tree()
     tree_html = build_notes_tree_html(notes_tree)
     tree_html = Markup(tree_html)
     tags = tagapi.get_all_tags()
@@ -776,6 +1302,7 @@ def manage_all_tags():
 
 
 @app.route("/create_tag", methods=["POST"])
+@invalidates_trees
 def create_tag():
     name = request.form.get("name")
     if not name:
@@ -792,6 +1319,7 @@ def create_tag():
 
 
 @app.route("/rename_tag/<int:tag_id>", methods=["POST"])
+@invalidates_trees
 def rename_tag(tag_id):
     new_name = request.form.get("name")
     if not new_name:
@@ -808,6 +1336,7 @@ def rename_tag(tag_id):
 
 
 @app.route("/delete_tag/<int:tag_id>", methods=["POST"])
+@invalidates_trees
 def delete_tag(tag_id):
     try:
         tagapi.delete_tag(tag_id)
@@ -819,6 +1348,7 @@ def delete_tag(tag_id):
 
 
 @app.route("/api/attach_child_tag", methods=["POST"])
+@invalidates_trees
 def attach_child_tag_endpoint():
     data = request.get_json()
     parent_id = data.get("parent_tag_id")
@@ -835,6 +1365,7 @@ def attach_child_tag_endpoint():
 
 
 @app.route("/api/detach_note_from_tag", methods=["POST"])
+@invalidates_trees
 def detach_note_from_tag_endpoint():
     data = request.get_json()
     note_id = data.get("note_id")
@@ -851,6 +1382,7 @@ def detach_note_from_tag_endpoint():
 
 
 @app.route("/api/attach_note_to_tag", methods=["POST"])
+@invalidates_trees
 def attach_note_to_tag_endpoint():
     data = request.get_json()
     note_id = data.get("note_id")
@@ -867,6 +1399,7 @@ def attach_note_to_tag_endpoint():
 
 
 @app.route("/api/attach_child_note", methods=["POST"])
+@invalidates_trees
 def attach_child_note_endpoint():
     data = request.get_json()
     parent_id = data.get("parent_note_id")
@@ -882,23 +1415,39 @@ def attach_child_note_endpoint():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/cache_stats")
+def cache_stats():
+    return jsonify(
+        {
+            "rendered_notes": render_cache.stats(),
+            "trees": {"hits": tree_cache.hits, "misses": tree_cache.misses},
+        }
+    )
+
+
 @app.route("/recent")
 def recent_pages():
-    recent_notes = get_recent_notes(limit=50)  # Adjust the limit as needed
-    notes_tree = noteapi.get_notes_tree()
+    cursor = request.args.get("cursor")
+    try:
+        page = get_recent_notes(limit=50, cursor=cursor)  # Adjust the limit as needed
+    except ValueError:
+        flash("Invalid cursor, showing the most recent notes", "error")
+        page = get_recent_notes(limit=50)
+    notes_tree = get_notes_tree()
     tree_html = build_notes_tree_html(notes_tree)
     tree_html = Markup(tree_html)
 
     return render_template(
         "recent_pages.html",
-        recent_notes=recent_notes,
+        recent_notes=page.notes,
+        next_cursor=page.next_cursor,
         tree_html=tree_html,
     )
 
 
 @app.context_processor
 def inject_tags():
-    return dict(tags=tagapi.get_tags_tree())
+    return dict(tags=get_tags_tree())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+import io
+from pathlib import Path
+from typing import Optional
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Originals are served if Pillow is missing from the environment
+    Image = None
+
+# Widths offered in srcset, requests for other widths are rounded up to one
+# of these so the number of variants cached per image stays bounded
+THUMBNAIL_WIDTHS = (320, 640, 1280)
+
+# Without Pillow every width would be the original, so offer none
+SRCSET_WIDTHS = THUMBNAIL_WIDTHS if Image is not None else ()
+
+# Formats that are resized, with the options used to save them
+THUMBNAIL_FORMATS = {
+    "JPEG": {"quality": 80, "optimize": True, "progressive": True},
+    "PNG": {"optimize": True},
+    "WEBP": {"quality": 80},
+}
+
+
+def thumbnail_width(requested: int) -> Optional[int]:
+    """The smallest allowed width at least as wide as the one requested"""
+    return next((w for w in THUMBNAIL_WIDTHS if w >= requested), None)
+
+
+def make_thumbnail(path: str | Path, width: int) -> Optional[tuple[bytes, str]]:
+    """
+    Resize an image to a width, preserving its aspect ratio and format.
+
+    Args:
+        path: The image to resize
+        width: The width of the thumbnail in pixels
+
+    Returns:
+        The encoded thumbnail and its MIME type, or None if the image should
+        be served as is: Pillow is not installed, the file is not an image of
+        a supported format, it is animated, or it is no wider than `width`.
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            format, mimetype = img.format, img.get_format_mimetype()
+            animated = getattr(img, "is_animated", False)
+            # Whatever its orientation, the width is at most the longer side
+            too_small = max(img.size) <= width
+            if format not in THUMBNAIL_FORMATS or animated or too_small:
+                return None
+            # Phone photos are often stored sideways with an orientation tag
+            img = ImageOps.exif_transpose(img)
+            if img.width <= width:
+                return None
+            img.thumbnail((width, img.height), Image.Resampling.LANCZOS)
+            if format == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            out = io.BytesIO()
+            img.save(out, format, **THUMBNAIL_FORMATS[format])
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    return out.getvalue(), mimetype
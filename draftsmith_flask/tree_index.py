@@ -0,0 +1,51 @@
+from typing import Optional
+
+from api import TreeNote
+
+
+class NoteTreeIndex:
+    """
+    Lookups by note id over the notes tree, built in a single pass.
+
+    The index is immutable and built once per version of the tree, so it can
+    be cached and shared between requests alongside the tree itself.
+    """
+
+    def __init__(self, notes_tree: list[TreeNote]):
+        self.roots = notes_tree
+        self.nodes: dict[int, TreeNote] = {}
+        self.parents: dict[int, Optional[int]] = {}
+        # Titles including those of every ancestor, e.g. "Parent/Child"
+        self.full_titles: dict[int, str] = {}
+
+        stack: list[tuple[TreeNote, Optional[int], str]] = [
+            (note, None, "") for note in reversed(notes_tree)
+        ]
+        while stack:
+            note, parent_id, parent_title = stack.pop()
+            # Keep the first occurrence in depth first order, as a search would
+            if note.id in self.nodes:
+                continue
+            full_title = f"{parent_title}/{note.title}".strip("/")
+            self.nodes[note.id] = note
+            self.parents[note.id] = parent_id
+            self.full_titles[note.id] = full_title
+            stack.extend(
+                (child, note.id, full_title) for child in reversed(note.children)
+            )
+
+    def ancestor_ids(self, note_id: int) -> list[int]:
+        """The ids of the ancestors of a note, nearest first"""
+        ancestors = []
+        parent_id = self.parents.get(note_id)
+        while parent_id is not None:
+            ancestors.append(parent_id)
+            parent_id = self.parents.get(parent_id)
+        return ancestors
+
+    def path(self, note_id: int) -> Optional[list[TreeNote]]:
+        """The notes from the root of the tree down to a note, or None if absent"""
+        if note_id not in self.nodes:
+            return None
+        ids = [note_id, *self.ancestor_ids(note_id)]
+        return [self.nodes[id] for id in reversed(ids)]